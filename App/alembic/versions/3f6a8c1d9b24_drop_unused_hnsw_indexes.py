@@ -0,0 +1,50 @@
+"""drop unused hnsw indexes
+
+Revision ID: 3f6a8c1d9b24
+Revises: 6e0d3a9f5c17
+Create Date: 2026-10-18 20:12:37.551204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a8c1d9b24'
+down_revision: Union[str, Sequence[str], None] = '6e0d3a9f5c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HNSW_PARAMS = {'m': 16, 'ef_construction': 64}
+
+# (table, vector column, hnsw index)
+VECTOR_COLUMNS = [
+    ('project_embeddings', 'embedding', 'ix_project_embeddings_embedding_hnsw'),
+    ('experiences', 'description_embedding', 'ix_experiences_description_embedding_hnsw'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every similarity query ranks one user's rows exactly (filtered by user_id first), since an
+    # HNSW scan only visits the ef_search nearest vectors of all users before that filter; the
+    # indexes were never used and only cost build time, disk and write amplification
+    with op.get_context().autocommit_block():
+        for table, _, index in VECTOR_COLUMNS:
+            op.drop_index(index, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column, index in VECTOR_COLUMNS:
+            # vector or halfvec, whichever migration 9c4f1b7e2a60 left in place
+            storage = op.get_bind().execute(
+                sa.text("SELECT udt_name FROM information_schema.columns WHERE table_name = :table AND column_name = :column"),
+                {'table': table, 'column': column},
+            ).scalar()
+            op.create_index(index, table, [column], unique=False,
+                            postgresql_using='hnsw', postgresql_with=HNSW_PARAMS,
+                            postgresql_ops={column: f'{storage}_ip_ops'}, postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""add full text search columns
+
+Revision ID: 6e0d3a9f5c17
+Revises: 9c4f1b7e2a60
+Create Date: 2026-10-18 18:05:33.918402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e0d3a9f5c17'
+down_revision: Union[str, Sequence[str], None] = '9c4f1b7e2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated columns stay in sync with the text on every write path, like text_hash
+    op.add_column('project_embeddings', sa.Column('search_vector', postgresql.TSVECTOR(),
+                  sa.Computed("to_tsvector('english', raw_text)", persisted=True), nullable=True))
+    op.add_column('experiences', sa.Column('search_vector', postgresql.TSVECTOR(),
+                  sa.Computed("to_tsvector('english', short_description)", persisted=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_project_embeddings_search_vector', 'project_embeddings', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_experiences_search_vector', 'experiences', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_experiences_search_vector', table_name='experiences')
+    op.drop_index('ix_project_embeddings_search_vector', table_name='project_embeddings')
+    op.drop_column('experiences', 'search_vector')
+    op.drop_column('project_embeddings', 'search_vector')
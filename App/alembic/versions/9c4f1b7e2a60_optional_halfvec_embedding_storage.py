@@ -0,0 +1,67 @@
+"""optional halfvec embedding storage
+
+Revision ID: 9c4f1b7e2a60
+Revises: d5a7e2c4b913
+Create Date: 2026-10-18 17:24:51.406217
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f1b7e2a60'
+down_revision: Union[str, Sequence[str], None] = 'd5a7e2c4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HNSW_PARAMS = {'m': 16, 'ef_construction': 64}
+EMBEDDING_DIM = 384
+
+# (table, vector column, hnsw index)
+VECTOR_COLUMNS = [
+    ('project_embeddings', 'embedding', 'ix_project_embeddings_embedding_hnsw'),
+    ('experiences', 'description_embedding', 'ix_experiences_description_embedding_hnsw'),
+]
+
+
+def _column_type(table: str, column: str) -> str:
+    return op.get_bind().execute(
+        sa.text("SELECT udt_name FROM information_schema.columns WHERE table_name = :table AND column_name = :column"),
+        {'table': table, 'column': column},
+    ).scalar()
+
+
+def _convert(storage: str) -> None:
+    """Rewrite the vector columns as `storage` ('vector' or 'halfvec') and rebuild their HNSW indexes."""
+    columns = [c for c in VECTOR_COLUMNS if _column_type(c[0], c[1]) != storage]
+    with op.get_context().autocommit_block():
+        for table, column, index in columns:
+            op.drop_index(index, table_name=table, postgresql_concurrently=True)
+    for table, column, _ in columns:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {storage}({EMBEDDING_DIM}) "
+            f"USING {column}::{storage}({EMBEDDING_DIM})"
+        )
+    with op.get_context().autocommit_block():
+        for table, column, index in columns:
+            op.create_index(index, table, [column], unique=False,
+                            postgresql_using='hnsw', postgresql_with=HNSW_PARAMS,
+                            postgresql_ops={column: f'{storage}_ip_ops'}, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Opt-in: only converts when EMBEDDING_STORAGE=halfvec, the same setting schema.py reads.
+    # To switch an existing database later, downgrade past this revision and upgrade again.
+    # The ALTER rewrites both tables under an ACCESS EXCLUSIVE lock
+    if os.getenv('EMBEDDING_STORAGE', 'vector') == 'halfvec':
+        _convert('halfvec')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert('vector')
@@ -0,0 +1,45 @@
+"""add embedding text hash columns
+
+Revision ID: a7d3e6b1c902
+Revises: 5f8b2c7e9a14
+Create Date: 2026-10-18 11:26:52.140377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e6b1c902'
+down_revision: Union[str, Sequence[str], None] = '5f8b2c7e9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project_embeddings', sa.Column('text_hash', sa.String(length=32), sa.Computed('md5(raw_text)', persisted=True), nullable=True))
+    op.add_column('project_embeddings', sa.Column('embedding_text_hash', sa.String(length=32), nullable=True))
+    op.add_column('experiences', sa.Column('text_hash', sa.String(length=32), sa.Computed('md5(short_description)', persisted=True), nullable=True))
+    op.add_column('experiences', sa.Column('embedding_text_hash', sa.String(length=32), nullable=True))
+
+    # embedding_text_hash stays NULL: nothing records which text an existing vector was computed
+    # from (an edited description may still carry its old vector), so the worker re-embeds every
+    # row once; repeated texts across rows are encoded only once thanks to the content cache
+
+    op.create_index('ix_project_embeddings_stale', 'project_embeddings', ['id'], unique=False,
+                    postgresql_where=sa.text('embedding_text_hash IS DISTINCT FROM text_hash'))
+    op.create_index('ix_experiences_stale', 'experiences', ['id'], unique=False,
+                    postgresql_where=sa.text('embedding_text_hash IS DISTINCT FROM text_hash'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_experiences_stale', table_name='experiences')
+    op.drop_index('ix_project_embeddings_stale', table_name='project_embeddings')
+    op.drop_column('experiences', 'embedding_text_hash')
+    op.drop_column('experiences', 'text_hash')
+    op.drop_column('project_embeddings', 'embedding_text_hash')
+    op.drop_column('project_embeddings', 'text_hash')
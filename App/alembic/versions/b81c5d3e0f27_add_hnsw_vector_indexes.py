@@ -0,0 +1,40 @@
+"""add hnsw vector indexes
+
+Revision ID: b81c5d3e0f27
+Revises: e2b9f4a6d831
+Create Date: 2026-10-18 15:37:44.208913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81c5d3e0f27'
+down_revision: Union[str, Sequence[str], None] = 'e2b9f4a6d831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# pgvector defaults; raise m / ef_construction for better recall at the cost of build time and size
+HNSW_PARAMS = {'m': 16, 'ef_construction': 64}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while large indexes build; it can't run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_project_embeddings_embedding_hnsw', 'project_embeddings', ['embedding'], unique=False,
+                        postgresql_using='hnsw', postgresql_with=HNSW_PARAMS,
+                        postgresql_ops={'embedding': 'vector_cosine_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_experiences_description_embedding_hnsw', 'experiences', ['description_embedding'], unique=False,
+                        postgresql_using='hnsw', postgresql_with=HNSW_PARAMS,
+                        postgresql_ops={'description_embedding': 'vector_cosine_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_experiences_description_embedding_hnsw', table_name='experiences', postgresql_concurrently=True)
+        op.drop_index('ix_project_embeddings_embedding_hnsw', table_name='project_embeddings', postgresql_concurrently=True)
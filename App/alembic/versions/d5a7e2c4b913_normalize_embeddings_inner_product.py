@@ -0,0 +1,62 @@
+"""normalize embeddings and switch hnsw indexes to inner product
+
+Revision ID: d5a7e2c4b913
+Revises: b81c5d3e0f27
+Create Date: 2026-10-18 16:52:09.731520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7e2c4b913'
+down_revision: Union[str, Sequence[str], None] = 'b81c5d3e0f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HNSW_PARAMS = {'m': 16, 'ef_construction': 64}
+
+# (table, vector column, hnsw index or None)
+VECTOR_COLUMNS = [
+    ('project_embeddings', 'embedding', 'ix_project_embeddings_embedding_hnsw'),
+    ('experiences', 'description_embedding', 'ix_experiences_description_embedding_hnsw'),
+    ('titles', 'description_embedding', None),
+    ('embedding_cache', 'embedding', None),
+]
+
+
+def _drop_indexes() -> None:
+    with op.get_context().autocommit_block():
+        for table, _, index in VECTOR_COLUMNS:
+            if index:
+                op.drop_index(index, table_name=table, postgresql_concurrently=True)
+
+
+def _create_indexes(opclass: str) -> None:
+    with op.get_context().autocommit_block():
+        for table, column, index in VECTOR_COLUMNS:
+            if index:
+                op.create_index(index, table, [column], unique=False,
+                                postgresql_using='hnsw', postgresql_with=HNSW_PARAMS,
+                                postgresql_ops={column: opclass}, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Unit-length vectors make inner product equal cosine similarity without per-comparison norms.
+    # The HNSW indexes are dropped first so rewriting every vector doesn't also maintain them;
+    # l2_normalize needs pgvector >= 0.7
+    _drop_indexes()
+    for table, column, _ in VECTOR_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = l2_normalize({column}) WHERE {column} IS NOT NULL")
+    _create_indexes('vector_ip_ops')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Normalized vectors rank identically under cosine distance, so the data is left as is
+    _drop_indexes()
+    _create_indexes('vector_cosine_ops')
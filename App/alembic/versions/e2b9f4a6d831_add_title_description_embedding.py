@@ -0,0 +1,39 @@
+"""add title description embedding
+
+Revision ID: e2b9f4a6d831
+Revises: a7d3e6b1c902
+Create Date: 2026-10-18 14:02:09.617455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b9f4a6d831'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e6b1c902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('titles', sa.Column('description_embedding', pgvector.sqlalchemy.vector.VECTOR(dim=384), nullable=True))
+    op.add_column('titles', sa.Column('embedding_lease_until', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('titles', sa.Column('text_hash', sa.String(length=32), sa.Computed('md5(description)', persisted=True), nullable=True))
+    op.add_column('titles', sa.Column('embedding_text_hash', sa.String(length=32), nullable=True))
+    # Titles with a description start out stale, so the worker embeds them on its first sweep
+    op.create_index('ix_titles_stale', 'titles', ['id'], unique=False,
+                    postgresql_where=sa.text('embedding_text_hash IS DISTINCT FROM text_hash'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_titles_stale', table_name='titles')
+    op.drop_column('titles', 'embedding_text_hash')
+    op.drop_column('titles', 'text_hash')
+    op.drop_column('titles', 'embedding_lease_until')
+    op.drop_column('titles', 'description_embedding')
@@ -0,0 +1,232 @@
+"""Latency and recall of project similarity search for exact scans and vector index configurations.
+
+    python -m App.benchmarks.vector_search --users 200 --projects 20 --queries 200 --k 5
+    EMBEDDING_STORAGE=halfvec python -m App.benchmarks.vector_search
+
+A synthetic corpus (users -> projects -> one description vector per embedding_type) is
+loaded into a separate `vector_bench` schema of the database in DATABASE_URL, using the
+app's own table definitions, so nothing in the application tables is touched. The schema
+is dropped at the end unless --keep is given.
+
+For every index configuration two workloads run, one query at a time on one connection:
+
+  user    SqlAlchemyProjectRepository.filter_projects_by_embedding for a random user,
+          i.e. exactly what resume generation executes
+  global  top-k descriptions over the whole table (ORDER BY embedding <#> q LIMIT k),
+          the query shape an ANN index can serve
+
+and report p50/p99 latency, QPS and recall@k against exact results computed in NumPy
+from the same float32 vectors, followed by each index's build time and size.
+
+The storage type (vector or halfvec) follows EMBEDDING_STORAGE, like the app schema does,
+so running once per type compares them: the "exact" rows show only the precision lost by
+storing halfvec, the index rows what an ANN index returns on top of that. The app itself
+ranks each user's rows exactly (see project_ranking), which the user rows measure.
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from App.profile_management.infrastructure.database.database import DATABASE_URL
+from App.profile_management.infrastructure.database.schema import (
+    Project as DBProject, ProjectEmbedding as DBProjectEmbedding, EMBEDDING_STORAGE, STORED_VECTOR_OPS
+)
+from App.profile_management.infrastructure.repositories.sql_repositories import SqlAlchemyProjectRepository
+
+SCHEMA = "vector_bench"
+EMBEDDING_DIM = 384
+EMBEDDING_TYPES = ("features", "tech_stack", "challenges")
+INDEX_NAME = "ix_bench_embedding"
+
+
+@dataclass
+class IndexConfig:
+    name: str
+    # None benchmarks the exact scan without any vector index
+    using: Optional[str] = None
+    params: Dict[str, int] = field(default_factory=dict)
+    # Query-time settings to sweep: (ef_search, probes)
+    search: List[tuple] = field(default_factory=lambda: [(None, None)])
+
+
+def index_configs(rows: int) -> List[IndexConfig]:
+    lists = max(1, int(rows ** 0.5))
+    return [
+        IndexConfig("exact"),
+        IndexConfig("hnsw m=16 ef_c=64", "hnsw", {"m": 16, "ef_construction": 64},
+                    [(40, None), (100, None), (200, None)]),
+        IndexConfig("hnsw m=32 ef_c=128", "hnsw", {"m": 32, "ef_construction": 128},
+                    [(40, None), (100, None)]),
+        IndexConfig(f"ivfflat lists={lists}", "ivfflat", {"lists": lists},
+                    [(None, 1), (None, max(1, lists // 10)), (None, max(1, lists // 4))]),
+    ]
+
+
+async def set_vector_search_params(session: AsyncSession, ef_search: Optional[int], probes: Optional[int]):
+    # set_config(..., true) is transaction-local like SET LOCAL, so it ends with each query's rollback
+    if ef_search is not None:
+        await session.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"), {"value": str(ef_search)})
+    if probes is not None:
+        await session.execute(text("SELECT set_config('ivfflat.probes', :value, true)"), {"value": str(probes)})
+
+
+def synthetic_vectors(count: int, clusters: int, seed: int):
+    """Unit vectors scattered around a few centroids, like descriptions of similar projects."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(clusters, EMBEDDING_DIM))
+    vectors = centroids[rng.integers(clusters, size=count)] + 0.6 * rng.normal(size=(count, EMBEDDING_DIM))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+@dataclass
+class Corpus:
+    users: List[str]
+    project_user: np.ndarray     # project index -> user index
+    row_project: np.ndarray      # description row -> project index
+    vectors: np.ndarray          # description row -> unit vector
+    queries: np.ndarray
+
+
+def build_corpus(users: int, projects: int, queries: int, seed: int = 7) -> Corpus:
+    project_user = np.repeat(np.arange(users), projects)
+    row_project = np.repeat(np.arange(len(project_user)), len(EMBEDDING_TYPES))
+    vectors = synthetic_vectors(len(row_project) + queries, clusters=64, seed=seed)
+    return Corpus([f"bench-user-{u}" for u in range(users)], project_user, row_project,
+                  vectors[queries:], vectors[:queries])
+
+
+async def load(session: AsyncSession, corpus: Corpus):
+    now = datetime.utcnow()
+    await session.execute(insert(DBProject), [
+        {"id": p + 1, "user_id": corpus.users[u], "name": f"project {p}", "status": "active",
+         "created_at": now, "updated_at": now}
+        for p, u in enumerate(corpus.project_user)
+    ])
+    await session.execute(insert(DBProjectEmbedding), [
+        {"id": r + 1, "project_id": int(p) + 1, "embedding_type": EMBEDDING_TYPES[r % len(EMBEDDING_TYPES)],
+         "raw_text": f"description {r}", "embedding": vector.tolist(), "created_at": now}
+        for r, (p, vector) in enumerate(zip(corpus.row_project, corpus.vectors))
+    ])
+    await session.commit()
+
+
+def exact_user_top_k(corpus: Corpus, query, user: int, k: int):
+    rows = np.flatnonzero(corpus.project_user[corpus.row_project] == user)
+    best = {}
+    for row, score in zip(rows, corpus.vectors[rows] @ query):
+        project = int(corpus.row_project[row]) + 1
+        best[project] = max(best.get(project, -np.inf), score)
+    return set(sorted(best, key=best.get, reverse=True)[:k])
+
+
+def exact_global_top_k(corpus: Corpus, query, k: int):
+    return set((np.argsort(-(corpus.vectors @ query), kind="stable")[:k] + 1).tolist())
+
+
+def summarize(latencies: List[float], recalls: List[float]) -> str:
+    latencies_ms = np.asarray(latencies) * 1000
+    return (f"{np.percentile(latencies_ms, 50):>8.2f} {np.percentile(latencies_ms, 99):>8.2f} "
+            f"{len(latencies) / sum(latencies):>8.0f} {np.mean(recalls):>9.3f}")
+
+
+async def run_workloads(Session, corpus: Corpus, config: IndexConfig, k: int, seed: int):
+    rng = np.random.default_rng(seed)
+    query_users = rng.integers(len(corpus.users), size=len(corpus.queries))
+    global_stmt = text(
+        f"SELECT id FROM {SCHEMA}.project_embeddings ORDER BY embedding <#> CAST(:query AS {EMBEDDING_STORAGE}({EMBEDDING_DIM})) LIMIT :k"
+    )
+    for i, (ef_search, probes) in enumerate(config.search):
+        settings = ", ".join(f"{name}={value}" for name, value in (("ef_search", ef_search), ("probes", probes)) if value)
+        # The user workload keeps each project's best description (GROUP BY), a shape no ANN
+        # index serves, so the search settings only change the global workload
+        for workload in ("user", "global") if i == 0 else ("global",):
+            latencies, recalls = [], []
+            async with Session() as session:
+                repo = SqlAlchemyProjectRepository(session, vector_index=None)
+                for query, user in zip(corpus.queries, query_users):
+                    if workload == "global":
+                        # Applied per query (it's transaction-local), but outside the timing:
+                        # the exact rows don't pay for this round trip either
+                        await set_vector_search_params(session, ef_search, probes)
+                    started = time.perf_counter()
+                    if workload == "user":
+                        found = {p.id for p in await repo.filter_projects_by_embedding(corpus.users[user], query.tolist(), k)}
+                    else:
+                        literal = "[" + ",".join(str(float(x)) for x in query) + "]"
+                        found = set((await session.execute(global_stmt, {"query": literal, "k": k})).scalars())
+                    latencies.append(time.perf_counter() - started)
+                    await session.rollback()
+                    if workload == "user":
+                        expected = exact_user_top_k(corpus, query, user, k)
+                    else:
+                        expected = exact_global_top_k(corpus, query, k)
+                    recalls.append(len(found & expected) / max(1, len(expected)))
+            print(f"{config.name:<22} {settings:<14} {workload:<7} {summarize(latencies, recalls)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20, help="projects per user")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema afterwards")
+    args = parser.parse_args()
+
+    engine = create_async_engine(DATABASE_URL).execution_options(schema_translate_map={None: SCHEMA})
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    tables = [DBProject.__table__, DBProjectEmbedding.__table__]
+
+    corpus = build_corpus(args.users, args.projects, args.queries, args.seed)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(lambda sync_conn: DBProject.metadata.create_all(sync_conn, tables=tables))
+    async with Session() as session:
+        await load(session, corpus)
+    print(f"{len(corpus.users)} users, {len(corpus.project_user)} projects, {len(corpus.vectors)} "
+          f"{EMBEDDING_STORAGE} descriptions, {len(corpus.queries)} queries, k={args.k}\n")
+
+    print(f"{'index':<22} {'settings':<14} {'query':<7} {'p50 ms':>8} {'p99 ms':>8} {'QPS':>8} {'recall@k':>9}")
+    builds = []
+    try:
+        for config in index_configs(len(corpus.vectors)):
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {SCHEMA}.{INDEX_NAME}"))
+                started = time.perf_counter()
+                if config.using:
+                    params = ", ".join(f"{name} = {value}" for name, value in config.params.items())
+                    await conn.execute(text(
+                        f"CREATE INDEX {INDEX_NAME} ON {SCHEMA}.project_embeddings "
+                        f"USING {config.using} (embedding {STORED_VECTOR_OPS}) WITH ({params})"
+                    ))
+                build_seconds = time.perf_counter() - started
+                await conn.execute(text(f"ANALYZE {SCHEMA}.project_embeddings"))
+                heap, index = (await conn.execute(text(
+                    f"SELECT pg_relation_size('{SCHEMA}.project_embeddings'), "
+                    f"coalesce(pg_relation_size(to_regclass('{SCHEMA}.{INDEX_NAME}')), 0)"
+                ))).one()
+            builds.append((config.name, build_seconds, heap, index))
+            await run_workloads(Session, corpus, config, args.k, args.seed)
+
+        print(f"\n{'index':<22} {'build s':>8} {'heap MB':>8} {'index MB':>9}")
+        for name, build_seconds, heap, index in builds:
+            print(f"{name:<22} {build_seconds:>8.1f} {heap / 2**20:>8.1f} {index / 2**20:>9.1f}")
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -25,6 +25,8 @@ class Title:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
     id: Optional[int] = None
+    # Embedding of the current description; None until the worker has (re)computed it
+    description_embedding: Optional[List[float]] = None
 
 @dataclass
 class ProjectDescription:
@@ -42,6 +44,8 @@ class Project:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     id: Optional[int] = None
+    # Similarity to the query when the project comes from a ranked search
+    score: Optional[float] = None
 
 @dataclass
 class ProjectEmbedding:
@@ -89,3 +93,16 @@ class Skill:
     skills: List[str] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.utcnow)
     id: Optional[int] = None
+
+@dataclass
+class ProfileSnapshot:
+    """Everything resume generation reads about a user: profile, top title, skills,
+    experiences and projects with their descriptions.
+
+    When the title has a description_embedding, experiences and projects are only the
+    ones ranked most similar to it (projects carry their score); otherwise all of them."""
+    profile: UserProfile
+    title: Optional[Title] = None
+    skills: List[Skill] = field(default_factory=list)
+    experiences: List[Expriance] = field(default_factory=list)
+    projects: List[Project] = field(default_factory=list)
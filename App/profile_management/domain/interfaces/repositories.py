@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag, ProjectEmbedding, Expriance, Skill
+from typing import Dict, List, Optional
+from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag, ProjectEmbedding, Expriance, Skill, ProfileSnapshot
 
 class ProfileRepository(ABC):
     @abstractmethod
@@ -62,7 +62,20 @@ class ProjectRepository(ABC):
         pass
 
     @abstractmethod
-    async def filter_projects_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5) -> List[Project]:
+    async def filter_projects_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5,
+                                           type_weights: Optional[Dict[str, float]] = None,
+                                           title_id: Optional[int] = None) -> List[Project]:
+        pass
+
+    @abstractmethod
+    async def filter_projects_by_embeddings(self, user_id: str, embeddings: List[List[float]], limit: int = 5,
+                                            type_weights: Optional[Dict[str, float]] = None,
+                                            title_ids: Optional[List[int]] = None) -> List[List[Project]]:
+        pass
+
+    @abstractmethod
+    async def hybrid_search_projects(self, user_id: str, query_text: str, embedding: List[float],
+                                     limit: int = 5) -> List[Project]:
         pass
 
 class TagRepository(ABC):
@@ -94,6 +107,19 @@ class ExprianceRepository(ABC):
     @abstractmethod
     async def get_by_id(self, expriance_id: int) -> Optional['Expriance']:
         pass
+
+    @abstractmethod
+    async def filter_experiences_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5) -> List['Expriance']:
+        pass
+
+    @abstractmethod
+    async def filter_experiences_by_embeddings(self, user_id: str, embeddings: List[List[float]], limit: int = 5) -> List[List['Expriance']]:
+        pass
+
+    @abstractmethod
+    async def hybrid_search_experiences(self, user_id: str, query_text: str, embedding: List[float],
+                                        limit: int = 5) -> List['Expriance']:
+        pass
     
     @abstractmethod
     async def delete(self, expriance_id: int) -> bool:
@@ -119,3 +145,9 @@ class SkillRepository(ABC):
     @abstractmethod
     async def delete(self, skill_id: int) -> bool:
         pass
+
+class ProfileSnapshotRepository(ABC):
+    @abstractmethod
+    async def get_by_user_id(self, user_id: str, max_projects: int = 5,
+                             max_experiences: int = 5) -> Optional[ProfileSnapshot]:
+        pass
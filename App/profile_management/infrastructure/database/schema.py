@@ -1,9 +1,19 @@
+import os
 from sqlalchemy import (
-    Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint, JSON
+    Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint, JSON, Computed, Index, func, text
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 from App.profile_management.infrastructure.database.database import Base
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import Vector, HALFVEC
+
+# 'halfvec' stores project/experience vectors in half precision (half the heap size);
+# must match what migration 9c4f1b7e2a60 applied to the database
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "vector")
+if EMBEDDING_STORAGE not in ("vector", "halfvec"):
+    raise ValueError(f"EMBEDDING_STORAGE must be 'vector' or 'halfvec', got '{EMBEDDING_STORAGE}'")
+StoredVector = HALFVEC if EMBEDDING_STORAGE == "halfvec" else Vector
+STORED_VECTOR_OPS = f"{EMBEDDING_STORAGE}_ip_ops"
 
 class UserProfile(Base):
     __tablename__ = 'user_profiles'
@@ -32,11 +42,18 @@ class Title(Base):
     title_name = Column(String(255), nullable=False)
     description = Column(Text)
     priority = Column(Integer, default=0)
+    # Precomputed by the embedding worker so resume generation needs no model inference
+    description_embedding = Column(Vector(384), nullable=True)
+    embedding_lease_until = Column(DateTime(timezone=True), nullable=True)
+    text_hash = Column(String(32), Computed("md5(description)", persisted=True))
+    embedding_text_hash = Column(String(32), nullable=True)
 
     created_at = Column(DateTime, nullable=False)
 
     __table_args__ = (
         UniqueConstraint('user_id', 'title_name'),
+        Index("ix_titles_stale", "id",
+              postgresql_where=text("embedding_text_hash IS DISTINCT FROM text_hash")),
     )
 
 class Project(Base):
@@ -89,7 +106,15 @@ class ProjectEmbedding(Base):
     # "overview", "features", "tech_stack"
     raw_text = Column(Text, nullable=False)
 
-    embedding = Column(Vector(384), nullable=True)
+    embedding = Column(StoredVector(384), nullable=True)
+    # Set by the embedding worker while it owns the row; an expired lease can be reclaimed
+    embedding_lease_until = Column(DateTime(timezone=True), nullable=True)
+    # md5 of the current raw_text vs. the text the stored vector was computed from;
+    # the worker re-embeds every row where the two differ
+    text_hash = Column(String(32), Computed("md5(raw_text)", persisted=True))
+    embedding_text_hash = Column(String(32), nullable=True)
+    # Lexical side of hybrid search
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('english', raw_text)", persisted=True))
 
     created_at = Column(DateTime, nullable=False)
 
@@ -97,9 +122,23 @@ class ProjectEmbedding(Base):
 
     __table_args__ = (
         UniqueConstraint("project_id", "embedding_type"),
+        Index("ix_project_embeddings_stale", "id",
+              postgresql_where=text("embedding_text_hash IS DISTINCT FROM text_hash")),
+        Index("ix_project_embeddings_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of the whitespace-normalized text; written and read only by the embedding worker
+    text_hash = Column(String(64), primary_key=True)
+    model_name = Column(String(255), primary_key=True)
+    embedding = Column(Vector(384), nullable=False)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
 class Experience(Base):
     __tablename__ = "experiences"
 
@@ -112,12 +151,22 @@ class Experience(Base):
     short_description = Column(Text, nullable=False)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
-    description_embedding = Column(Vector(384), nullable=True)  # Embedding for short_description
+    description_embedding = Column(StoredVector(384), nullable=True)  # Embedding for short_description
+    embedding_lease_until = Column(DateTime(timezone=True), nullable=True)  # Worker claim on description_embedding
+    text_hash = Column(String(32), Computed("md5(short_description)", persisted=True))
+    embedding_text_hash = Column(String(32), nullable=True)  # text_hash that description_embedding was computed from
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('english', short_description)", persisted=True))
 
     tech_stack = Column(JSON, nullable=True)  # Store list of strings as JSON
 
     created_at = Column(DateTime, nullable=False)
 
+    __table_args__ = (
+        Index("ix_experiences_stale", "id",
+              postgresql_where=text("embedding_text_hash IS DISTINCT FROM text_hash")),
+        Index("ix_experiences_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class Skill(Base):
     __tablename__ = "skills"
@@ -1,12 +1,134 @@
-from typing import List, Optional
+import os
+import json
+from dataclasses import replace
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, func, case, literal, cast, true, exists, or_, Integer, Text, Float, JSON
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 from sqlalchemy.orm import selectinload
-from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag, ProjectEmbedding, ProjectDescription, Expriance, Skill
-from App.profile_management.domain.interfaces.repositories import ProfileRepository, TitleRepository, ProjectRepository, TagRepository, ExprianceRepository, SkillRepository
+from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag, ProjectEmbedding, ProjectDescription, Expriance, Skill, ProfileSnapshot
+from App.profile_management.domain.interfaces.repositories import ProfileRepository, TitleRepository, ProjectRepository, TagRepository, ExprianceRepository, SkillRepository, ProfileSnapshotRepository
 from App.profile_management.infrastructure.database.schema import UserProfile as DBUserProfile, Title as DBTitle, Project as DBProject, Tag as DBTag, TitleProject, TagProject, ProjectEmbedding as DBProjectEmbedding, Experience as DBExperience, Skill as DBSkill
+from App.profile_management.infrastructure.repositories.vector_index import UserVectorIndex, UserVectorIndexCache
 from datetime import datetime
 
+# Channel the embedding worker LISTENs on; the payload names the table that has new text to embed
+EMBEDDING_JOBS_CHANNEL = "embedding_jobs"
+
+async def notify_embedding_job(session: AsyncSession, target: str):
+    # NOTIFY is transactional, so the worker is only woken once the surrounding commit succeeds
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": EMBEDDING_JOBS_CHANNEL, "payload": target}
+    )
+
+# Blend of explicit links into similarity ranking for a target title: projects attached to the
+# title (title_project) get TITLE_LINK_BOOST added to their score, projects sharing a tag
+# (tag_project) with those get TAG_MATCH_BOOST. With PROJECT_TITLE_SCOPE=filter, only such
+# projects are candidates at all, as long as the title has any linked project
+TITLE_LINK_BOOST = float(os.getenv("PROJECT_TITLE_LINK_BOOST", "0.15"))
+TAG_MATCH_BOOST = float(os.getenv("PROJECT_TAG_MATCH_BOOST", "0.05"))
+TITLE_SCOPE = os.getenv("PROJECT_TITLE_SCOPE", "boost")
+if TITLE_SCOPE not in ("boost", "filter"):
+    raise ValueError(f"PROJECT_TITLE_SCOPE must be 'boost' or 'filter', got '{TITLE_SCOPE}'")
+
+# Reciprocal rank fusion for hybrid search: each list contributes 1 / (RRF_K + rank), and
+# only the top HYBRID_CANDIDATES of the text and the vector list take part
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+# ts_rank_cd normalization 1 divides by 1 + log(document length), so long descriptions
+# don't win on term frequency alone (closer to BM25 than the raw rank)
+TS_RANK_NORMALIZATION = 1
+
+# Optional per-process index of each user's description vectors; with a few dozen vectors per
+# user, one matrix-vector product beats an ANN round trip. Off unless PROJECT_VECTOR_INDEX is set.
+PROJECT_VECTOR_INDEX = (
+    UserVectorIndexCache(
+        max_users=int(os.getenv("PROJECT_VECTOR_INDEX_MAX_USERS", "1000")),
+        ttl_seconds=float(os.getenv("PROJECT_VECTOR_INDEX_TTL", "300")),
+    )
+    if os.getenv("PROJECT_VECTOR_INDEX", "").lower() in ("1", "true") else None
+)
+
+def rrf_score(text_rank, vector_rank):
+    # A side that didn't return the row (NULL rank after the FULL JOIN) contributes nothing
+    return cast(
+        func.coalesce(1.0 / (RRF_K + text_rank), 0.0) + func.coalesce(1.0 / (RRF_K + vector_rank), 0.0),
+        Float,
+    )
+
+def unnest_query_vectors(embeddings: List[List[float]], vector_type, title_ids: Optional[List[int]] = None):
+    # All query vectors travel as one text[] parameter; each row is (position, query) with a
+    # 1-based position, so one statement can LATERAL-join a top-k search per query vector.
+    # With title_ids, the title each vector belongs to comes along as a title_id column
+    literals = ["[" + ",".join(str(float(x)) for x in embedding) + "]" for embedding in embeddings]
+    if title_ids is None:
+        columns, arrays = ("query",), (literal(literals, ARRAY(Text)),)
+    else:
+        columns, arrays = ("title_id", "query"), (literal(title_ids, ARRAY(Integer)), literal(literals, ARRAY(Text)))
+    queries = (
+        func.unnest(*arrays)
+        .table_valued(*columns, with_ordinality="position")
+        .render_derived(name="queries")
+    )
+    return queries, cast(queries.c.query, vector_type)
+
+def fresh_vector(model):
+    # A stored vector only describes the current text if it was computed from the same text_hash
+    return model.embedding_text_hash == model.text_hash
+
+def experience_distance(query):
+    # <#> to the query; NULL for experiences without a vector for their current description,
+    # so under NULLS LAST they rank after every fresh one instead of disappearing
+    return case((fresh_vector(DBExperience), DBExperience.description_embedding.max_inner_product(query)))
+
+def title_links(title_id, project_id):
+    # Is the project attached to the title, and does it share a tag with a project that is?
+    linked = exists().where(TitleProject.title_id == title_id, TitleProject.project_id == project_id)
+    linked_tags = (
+        select(TagProject.tag_id)
+        .join(TitleProject, TitleProject.project_id == TagProject.project_id)
+        .filter(TitleProject.title_id == title_id)
+    )
+    tagged = exists().where(TagProject.project_id == project_id, TagProject.tag_id.in_(linked_tags))
+    return linked, tagged
+
+def project_ranking(user_id: str, query, limit: int, type_weights: Optional[Dict[str, float]] = None,
+                    title_id=None, title_link_boost: float = TITLE_LINK_BOOST,
+                    tag_match_boost: float = TAG_MATCH_BOOST, title_scope: str = TITLE_SCOPE):
+    """(project_id, score) of the user's top `limit` projects for a query vector.
+
+    Each description is scored by cosine similarity, optionally weighted per embedding_type
+    (types missing from type_weights count 1.0), and each project keeps its best description
+    in SQL so LIMIT applies to distinct projects rather than to joined description rows.
+    `query` and `title_id` may be values or SQL expressions such as scalar subqueries.
+    Like every similarity query here it scans the user's rows exactly: an HNSW scan would
+    only visit the ef_search nearest vectors of all users before the user filter.
+    """
+    # Stored vectors are unit length, so cosine similarity is the inner product (<#> is its negative).
+    # A description without a vector for its current text scores NULL, so a project the worker
+    # hasn't (re)embedded yet still comes back, ranked last
+    similarity = case((fresh_vector(DBProjectEmbedding), -DBProjectEmbedding.embedding.max_inner_product(query)))
+    if type_weights:
+        weight = case(type_weights, value=DBProjectEmbedding.embedding_type, else_=literal(1.0))
+        similarity = weight * similarity
+    score = func.max(similarity)
+    best = (
+        select(DBProjectEmbedding.project_id)
+        .join(DBProject, DBProject.id == DBProjectEmbedding.project_id)
+        .filter(DBProject.user_id == user_id)
+        .group_by(DBProjectEmbedding.project_id)
+    )
+    if title_id is not None:
+        linked, tagged = title_links(title_id, DBProjectEmbedding.project_id)
+        score = (score + case((linked, title_link_boost), else_=0.0)
+                 + case((tagged, tag_match_boost), else_=0.0))
+        if title_scope == "filter":
+            has_links = exists().where(TitleProject.title_id == title_id)
+            best = best.filter(or_(linked, tagged, ~has_links))
+    score = score.label("score")
+    return best.add_columns(score).order_by(score.desc().nulls_last()).limit(limit)
+
 class SqlAlchemyProfileRepository(ProfileRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -103,27 +225,39 @@ class SqlAlchemyTitleRepository(TitleRepository):
         db_title = result.scalars().first()
         
         if db_title:
+            description_changed = db_title.description != title.description
             db_title.title_name = title.title_name
             db_title.description = title.description
             db_title.priority = title.priority
+            if description_changed:
+                await notify_embedding_job(self.session, "title")
             await self.session.commit()
             await self.session.refresh(db_title)
             return self._to_domain(db_title)
         return None
 
     def _to_domain(self, db_title: DBTitle) -> Title:
+        # A vector computed from an older description is never handed out
+        fresh = db_title.description_embedding is not None and db_title.embedding_text_hash == db_title.text_hash
         return Title(
             id=db_title.id,
             user_id=db_title.user_id,
             title_name=db_title.title_name,
             description=db_title.description,
             priority=db_title.priority,
-            created_at=db_title.created_at
+            created_at=db_title.created_at,
+            description_embedding=db_title.description_embedding.tolist() if fresh else None
         )
 
 class SqlAlchemyProjectRepository(ProjectRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, vector_index: Optional[UserVectorIndexCache] = PROJECT_VECTOR_INDEX,
+                 title_link_boost: float = TITLE_LINK_BOOST, tag_match_boost: float = TAG_MATCH_BOOST,
+                 title_scope: str = TITLE_SCOPE):
         self.session = session
+        self.vector_index = vector_index
+        self.title_link_boost = title_link_boost
+        self.tag_match_boost = tag_match_boost
+        self.title_scope = title_scope
 
     async def create(self, project: Project) -> Project:
         db_project = DBProject(
@@ -138,6 +272,8 @@ class SqlAlchemyProjectRepository(ProjectRepository):
         self.session.add(db_project)
         await self.session.commit()
         await self.session.refresh(db_project)
+        if self.vector_index is not None:
+            self.vector_index.invalidate(project.user_id)
         return self._to_domain(db_project)
 
     async def get_all(self, user_id: str) -> List[Project]:
@@ -177,26 +313,16 @@ class SqlAlchemyProjectRepository(ProjectRepository):
         await self.session.commit()
 
     async def get_project_by_title_name(self,user_id, title_name: str) -> Optional[List[Project]]:
-        stmt = select(DBTitle).filter_by(title_name=title_name, user_id=user_id)
-        result = await self.session.execute(stmt)
-        db_title = result.scalars().first()
-        if not db_title:
-            return None
-        stmt = select(TitleProject).filter_by(title_id=db_title.id)
+        stmt = (
+            select(DBProject)
+            .join(TitleProject, TitleProject.project_id == DBProject.id)
+            .join(DBTitle, DBTitle.id == TitleProject.title_id)
+            .filter(DBTitle.user_id == user_id, DBTitle.title_name == title_name)
+        )
         result = await self.session.execute(stmt)
-        db_title_project = result.scalars().all()
-        if not db_title_project:
-            return None
-        projects = []
-        for tp in db_title_project:
-            stmt = select(DBProject).filter_by(id=tp.project_id)
-            result = await self.session.execute(stmt)
-            db_project = result.scalars().first()
-            if db_project:
-                projects.append(self._to_domain(db_project))
-        return projects
-        
-        
+        db_projects = result.scalars().all()
+        # None for an unknown title or one without projects, as before
+        return [self._to_domain(p) for p in db_projects] or None
 
     async def attach_tags(self, project_id: int, tags: List[str]):
         # Implementation for attaching tags (assuming tags already exist or we create them)
@@ -242,8 +368,11 @@ class SqlAlchemyProjectRepository(ProjectRepository):
             created_at=datetime.utcnow()
         )
         self.session.add(db_emb)
+        await notify_embedding_job(self.session, "project")
         await self.session.commit()
         await self.session.refresh(db_emb)
+        if self.vector_index is not None:
+            self.vector_index.invalidate_project(embedding.project_id)
         embedding.id = db_emb.id
         return embedding
 
@@ -263,22 +392,155 @@ class SqlAlchemyProjectRepository(ProjectRepository):
             ) for e in db_embs
         ]
 
-    async def filter_projects_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5) -> List[Project]:
-        # Join with DBProjectEmbedding and order by cosine distance (most similar first)
+    async def filter_projects_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5,
+                                           type_weights: Optional[Dict[str, float]] = None,
+                                           title_id: Optional[int] = None) -> List[Project]:
+        if self.vector_index is not None:
+            index = self.vector_index.get(user_id) or await self._load_vector_index(user_id)
+            boosts, candidates = await self._title_boosts(user_id, title_id) if title_id is not None else (None, None)
+            return [replace(index.projects[project_id], score=score)
+                    for project_id, score in index.rank(embedding, limit, type_weights, boosts, candidates)]
+
+        best = project_ranking(user_id, embedding, limit, type_weights, title_id,
+                               self.title_link_boost, self.tag_match_boost, self.title_scope).subquery()
         stmt = (
-            select(DBProject)
-            .join(DBProjectEmbedding, DBProject.id == DBProjectEmbedding.project_id)
+            select(DBProject, best.c.score)
+            .join(best, DBProject.id == best.c.project_id)
+            .order_by(best.c.score.desc().nulls_last())
+        )
+        result = await self.session.execute(stmt)
+        return [self._to_domain(db_project, score) for db_project, score in result.all()]
+
+    async def hybrid_search_projects(self, user_id: str, query_text: str, embedding: List[float],
+                                     limit: int = 5) -> List[Project]:
+        # Text and vector rankings of the user's projects (each by its best description), fused
+        # with reciprocal rank fusion in the same statement; a project found by only one side
+        # still scores from that side
+        tsquery = func.websearch_to_tsquery("english", query_text)
+        text_score = func.max(func.ts_rank_cd(DBProjectEmbedding.search_vector, tsquery, TS_RANK_NORMALIZATION))
+        text_hits = (
+            select(DBProjectEmbedding.project_id,
+                   func.row_number().over(order_by=text_score.desc()).label("rank"))
+            .join(DBProject, DBProject.id == DBProjectEmbedding.project_id)
+            .filter(DBProject.user_id == user_id)
+            .filter(DBProjectEmbedding.search_vector.op("@@")(tsquery))
+            .group_by(DBProjectEmbedding.project_id)
+            .order_by(text_score.desc())
+            .limit(HYBRID_CANDIDATES)
+            .cte("text_hits")
+        )
+        vector_score = func.max(-DBProjectEmbedding.embedding.max_inner_product(embedding))
+        vector_hits = (
+            select(DBProjectEmbedding.project_id,
+                   func.row_number().over(order_by=vector_score.desc()).label("rank"))
+            .join(DBProject, DBProject.id == DBProjectEmbedding.project_id)
             .filter(DBProject.user_id == user_id)
-            .order_by(DBProjectEmbedding.embedding.cosine_distance(embedding))
+            .filter(DBProjectEmbedding.embedding.isnot(None))
+            .filter(fresh_vector(DBProjectEmbedding))
+            .group_by(DBProjectEmbedding.project_id)
+            .order_by(vector_score.desc())
+            .limit(HYBRID_CANDIDATES)
+            .cte("vector_hits")
+        )
+        project_id = func.coalesce(text_hits.c.project_id, vector_hits.c.project_id)
+        fused_score = rrf_score(text_hits.c.rank, vector_hits.c.rank)
+        fused = (
+            select(project_id.label("project_id"), fused_score.label("score"))
+            .select_from(text_hits.join(vector_hits, text_hits.c.project_id == vector_hits.c.project_id, full=True))
+            .order_by(fused_score.desc())
             .limit(limit)
+            .subquery()
+        )
+        stmt = (
+            select(DBProject, fused.c.score)
+            .join(fused, DBProject.id == fused.c.project_id)
+            .order_by(fused.c.score.desc())
         )
         result = await self.session.execute(stmt)
-        # Use .unique() since a project might have multiple embeddings and could appear multiple times
-        db_projects = result.scalars().unique().all()
-        return [self._to_domain(p) for p in db_projects]
-    
+        return [self._to_domain(db_project, score) for db_project, score in result.all()]
 
-    def _to_domain(self, db_project: DBProject) -> Project:
+    async def _title_boosts(self, user_id: str, title_id: int):
+        # The same link/tag boosts (and filter scope) as project_ranking, for the in-process index:
+        # one small query for the user's projects that are linked to the title or share its tags
+        linked, tagged = title_links(title_id, DBProject.id)
+        stmt = select(DBProject.id, linked, tagged).filter(DBProject.user_id == user_id).filter(or_(linked, tagged))
+        result = await self.session.execute(stmt)
+        rows = result.all()
+        boosts = {project_id: self.title_link_boost * is_linked + self.tag_match_boost * is_tagged
+                  for project_id, is_linked, is_tagged in rows}
+        candidates = None
+        if self.title_scope == "filter" and any(is_linked for _, is_linked, _ in rows):
+            candidates = set(boosts)
+        return boosts, candidates
+
+    async def filter_projects_by_embeddings(self, user_id: str, embeddings: List[List[float]], limit: int = 5,
+                                            type_weights: Optional[Dict[str, float]] = None,
+                                            title_ids: Optional[List[int]] = None) -> List[List[Project]]:
+        if not embeddings:
+            return []
+        if self.vector_index is not None:
+            index = self.vector_index.get(user_id) or await self._load_vector_index(user_id)
+            title_boosts = {}
+            for title_id in dict.fromkeys(title_ids or []):
+                if title_id is not None:
+                    title_boosts[title_id] = await self._title_boosts(user_id, title_id)
+            ranked = []
+            for i, embedding in enumerate(embeddings):
+                boosts, candidates = title_boosts.get(title_ids[i], (None, None)) if title_ids else (None, None)
+                ranked.append([replace(index.projects[project_id], score=score)
+                               for project_id, score in index.rank(embedding, limit, type_weights, boosts, candidates)])
+            return ranked
+
+        # Same per-project best-description ranking as filter_projects_by_embedding, including the
+        # title link boosts of each vector's title, run once per query vector in a LATERAL
+        # subquery so all of them cost a single round trip
+        queries, query = unnest_query_vectors(embeddings, DBProjectEmbedding.embedding.type, title_ids)
+        best = (
+            project_ranking(user_id, query, limit, type_weights,
+                            queries.c.title_id if title_ids is not None else None,
+                            self.title_link_boost, self.tag_match_boost, self.title_scope)
+            .correlate(queries)
+            .lateral("best")
+        )
+        stmt = (
+            select(queries.c.position, DBProject, best.c.score)
+            .select_from(queries)
+            .join(best, true())
+            .join(DBProject, DBProject.id == best.c.project_id)
+            .order_by(queries.c.position, best.c.score.desc().nulls_last())
+        )
+        result = await self.session.execute(stmt)
+        ranked = [[] for _ in embeddings]
+        for position, db_project, score in result.all():
+            ranked[position - 1].append(self._to_domain(db_project, score))
+        return ranked
+
+    async def _load_vector_index(self, user_id: str) -> UserVectorIndex:
+        stmt = select(DBProject).filter_by(user_id=user_id)
+        result = await self.session.execute(stmt)
+        db_projects = result.scalars().all()
+
+        project_ids, embedding_types, vectors = [], [], []
+        pending = False
+        for db_project in db_projects:
+            for emb in db_project.embeddings:
+                # A vector of an older description text is left out (the project still ranks,
+                # last if it has no fresh vector), and the index isn't cached so the next query
+                # picks up the vectors the worker computes for the current text
+                fresh = emb.embedding_text_hash == emb.text_hash
+                pending = pending or not fresh
+                if emb.embedding is not None and fresh:
+                    project_ids.append(db_project.id)
+                    embedding_types.append(emb.embedding_type)
+                    vectors.append(emb.embedding)
+
+        index = UserVectorIndex([self._to_domain(p) for p in db_projects], project_ids, embedding_types, vectors)
+        if not pending:
+            self.vector_index.put(user_id, index)
+        return index
+
+
+    def _to_domain(self, db_project: DBProject, score: Optional[float] = None) -> Project:
         return Project(
             id=db_project.id,
             user_id=db_project.user_id,
@@ -288,7 +550,8 @@ class SqlAlchemyProjectRepository(ProjectRepository):
             status=db_project.status,
             created_at=db_project.created_at,
             updated_at=db_project.updated_at,
-            project_description=[ProjectDescription(emb.embedding_type,emb.raw_text) for emb in db_project.embeddings]
+            project_description=[ProjectDescription(emb.embedding_type,emb.raw_text) for emb in db_project.embeddings],
+            score=score
         )
 
         
@@ -350,6 +613,7 @@ class SqlAlchemyExprianceRepository(ExprianceRepository):
             created_at=datetime.utcnow()
         )
         self.session.add(db_expriance)
+        await notify_embedding_job(self.session, "experience")
         await self.session.commit()
         await self.session.refresh(db_expriance)
         return self._to_domain(db_expriance)
@@ -360,6 +624,8 @@ class SqlAlchemyExprianceRepository(ExprianceRepository):
         db_exp = result.scalars().first()
         
         if db_exp:
+            # The stored vector goes stale (its text_hash no longer matches) only when the text changes
+            description_changed = db_exp.short_description != expriance.short_description
             db_exp.company_name = expriance.company_name
             db_exp.employement_type = expriance.employement_type
             db_exp.role_title = expriance.role_title
@@ -367,6 +633,8 @@ class SqlAlchemyExprianceRepository(ExprianceRepository):
             db_exp.start_date = expriance.start_date
             db_exp.end_date = expriance.end_date
             db_exp.tech_stack = expriance.tech_stack
+            if description_changed:
+                await notify_embedding_job(self.session, "experience")
             await self.session.commit()
             await self.session.refresh(db_exp)
             return self._to_domain(db_exp)
@@ -387,6 +655,81 @@ class SqlAlchemyExprianceRepository(ExprianceRepository):
              return self._to_domain(db_exp)
         return None
 
+    async def filter_experiences_by_embedding(self, user_id: str, embedding: List[float], limit: int = 5) -> List[Expriance]:
+        # Most similar first; experiences the worker hasn't (re)embedded yet rank last instead of disappearing
+        stmt = (
+            select(DBExperience)
+            .filter(DBExperience.user_id == user_id)
+            .order_by(experience_distance(embedding).nulls_last())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        db_exps = result.scalars().all()
+        return [self._to_domain(e) for e in db_exps]
+
+    async def filter_experiences_by_embeddings(self, user_id: str, embeddings: List[List[float]], limit: int = 5) -> List[List[Expriance]]:
+        if not embeddings:
+            return []
+        queries, query = unnest_query_vectors(embeddings, DBExperience.description_embedding.type)
+        distance = experience_distance(query).label("distance")
+        top = (
+            select(DBExperience.id, distance)
+            .filter(DBExperience.user_id == user_id)
+            .order_by(distance.nulls_last())
+            .limit(limit)
+            # Only the query vector comes from outside; experiences is joined again outside
+            .correlate(queries)
+            .lateral("top")
+        )
+        stmt = (
+            select(queries.c.position, DBExperience)
+            .select_from(queries)
+            .join(top, true())
+            .join(DBExperience, DBExperience.id == top.c.id)
+            .order_by(queries.c.position, top.c.distance.nulls_last())
+        )
+        result = await self.session.execute(stmt)
+        ranked = [[] for _ in embeddings]
+        for position, db_exp in result.all():
+            ranked[position - 1].append(self._to_domain(db_exp))
+        return ranked
+
+    async def hybrid_search_experiences(self, user_id: str, query_text: str, embedding: List[float],
+                                        limit: int = 5) -> List[Expriance]:
+        # Same reciprocal rank fusion as SqlAlchemyProjectRepository.hybrid_search_projects
+        tsquery = func.websearch_to_tsquery("english", query_text)
+        text_score = func.ts_rank_cd(DBExperience.search_vector, tsquery, TS_RANK_NORMALIZATION)
+        text_hits = (
+            select(DBExperience.id, func.row_number().over(order_by=text_score.desc()).label("rank"))
+            .filter(DBExperience.user_id == user_id)
+            .filter(DBExperience.search_vector.op("@@")(tsquery))
+            .order_by(text_score.desc())
+            .limit(HYBRID_CANDIDATES)
+            .cte("text_hits")
+        )
+        # An exact ranking of the user's own experiences, like filter_experiences_by_embedding
+        distance = experience_distance(embedding)
+        vector_hits = (
+            select(DBExperience.id, func.row_number().over(order_by=distance).label("rank"))
+            .filter(DBExperience.user_id == user_id)
+            .filter(DBExperience.description_embedding.isnot(None))
+            .filter(fresh_vector(DBExperience))
+            .order_by(distance)
+            .limit(HYBRID_CANDIDATES)
+            .cte("vector_hits")
+        )
+        fused_score = rrf_score(text_hits.c.rank, vector_hits.c.rank)
+        fused = (
+            select(func.coalesce(text_hits.c.id, vector_hits.c.id).label("id"), fused_score.label("score"))
+            .select_from(text_hits.join(vector_hits, text_hits.c.id == vector_hits.c.id, full=True))
+            .order_by(fused_score.desc())
+            .limit(limit)
+            .subquery()
+        )
+        stmt = select(DBExperience).join(fused, DBExperience.id == fused.c.id).order_by(fused.c.score.desc())
+        result = await self.session.execute(stmt)
+        return [self._to_domain(e) for e in result.scalars().all()]
+
     async def delete(self, expriance_id: int) -> bool:
         stmt = select(DBExperience).filter_by(id=expriance_id)
         result = await self.session.execute(stmt)
@@ -473,3 +816,168 @@ class SqlAlchemySkillRepository(SkillRepository):
             skills=db_skill.skills,
             created_at=db_skill.created_at
         )
+
+def json_list(row, *order_by):
+    # json_agg of the rows' objects, [] rather than NULL when there are none
+    return func.coalesce(func.json_agg(aggregate_order_by(row, *order_by)), text("'[]'::json"), type_=JSON)
+
+def json_timestamp(column):
+    # Fixed-width ISO text, so datetime.fromisoformat reads it on every Python version
+    return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+class SqlAlchemyProfileSnapshotRepository(ProfileSnapshotRepository):
+    def __init__(self, session: AsyncSession, title_link_boost: float = TITLE_LINK_BOOST,
+                 tag_match_boost: float = TAG_MATCH_BOOST, title_scope: str = TITLE_SCOPE):
+        self.session = session
+        self.title_link_boost = title_link_boost
+        self.tag_match_boost = tag_match_boost
+        self.title_scope = title_scope
+
+    async def get_by_user_id(self, user_id: str, max_projects: int = 5,
+                             max_experiences: int = 5) -> Optional[ProfileSnapshot]:
+        # One statement: the profile row plus subqueries that aggregate the top title, skills,
+        # experiences and projects (with descriptions) into JSON. When the top title has a
+        # fresh stored vector, projects and experiences are ranked against it right here and
+        # only the top ones are aggregated; otherwise all of them are, in their usual order
+        top_title = (
+            select(DBTitle.id, DBTitle.title_name, DBTitle.description, DBTitle.priority,
+                   case((fresh_vector(DBTitle), DBTitle.description_embedding)).label("embedding"))
+            .where(DBTitle.user_id == user_id)
+            .order_by(DBTitle.priority.desc().nulls_last(), DBTitle.id)
+            .limit(1)
+            .cte("top_title")
+        )
+        title = select(func.json_build_object(
+            "id", top_title.c.id, "title_name", top_title.c.title_name, "description", top_title.c.description,
+            "priority", top_title.c.priority, "description_embedding", cast(top_title.c.embedding, Text),
+            type_=JSON)).scalar_subquery()
+        # Evaluated once per statement (an InitPlan), NULL without a title or a fresh vector
+        title_id = select(top_title.c.id).scalar_subquery()
+        query = select(top_title.c.embedding).scalar_subquery()
+        ranked = query.isnot(None)
+
+        skills = (
+            select(json_list(func.json_build_object(
+                "id", DBSkill.id, "skill_type", DBSkill.skill_type, "skills", DBSkill.skills), DBSkill.id))
+            .where(DBSkill.user_id == user_id)
+            .scalar_subquery()
+        )
+
+        experience = func.json_build_object(
+            "id", DBExperience.id, "company_name", DBExperience.company_name,
+            "employement_type", DBExperience.employement_type, "role_title", DBExperience.role_title,
+            "short_description", DBExperience.short_description, "tech_stack", DBExperience.tech_stack,
+            "start_date", json_timestamp(DBExperience.start_date),
+            "end_date", json_timestamp(DBExperience.end_date))
+        distance = experience_distance(query).label("distance")
+        top_experiences = (
+            select(DBExperience.id, distance)
+            .where(DBExperience.user_id == user_id)
+            .order_by(distance.nulls_last())
+            .limit(max_experiences)
+            .subquery("top_experiences")
+        )
+        experiences = case(
+            (ranked, select(json_list(experience, top_experiences.c.distance.nulls_last()))
+                .join_from(DBExperience, top_experiences, DBExperience.id == top_experiences.c.id)
+                .scalar_subquery()),
+            else_=select(json_list(experience, DBExperience.start_date.desc()))
+                .where(DBExperience.user_id == user_id)
+                .scalar_subquery(),
+        )
+
+        descriptions = (
+            select(json_list(func.json_build_object(
+                "type", DBProjectEmbedding.embedding_type, "text", DBProjectEmbedding.raw_text), DBProjectEmbedding.id))
+            .where(DBProjectEmbedding.project_id == DBProject.id)
+            .scalar_subquery()
+        )
+        def project(score):
+            return func.json_build_object(
+                "id", DBProject.id, "name", DBProject.name, "short_description", DBProject.short_description,
+                "repo_url", DBProject.repo_url, "status", DBProject.status, "descriptions", descriptions,
+                "score", score)
+        top_projects = project_ranking(user_id, query, max_projects, title_id=title_id,
+                                       title_link_boost=self.title_link_boost, tag_match_boost=self.tag_match_boost,
+                                       title_scope=self.title_scope).subquery("top_projects")
+        projects = case(
+            (ranked, select(json_list(project(top_projects.c.score), top_projects.c.score.desc().nulls_last()))
+                .join_from(DBProject, top_projects, DBProject.id == top_projects.c.project_id)
+                .scalar_subquery()),
+            else_=select(json_list(project(None), DBProject.id))
+                .where(DBProject.user_id == user_id)
+                .scalar_subquery(),
+        )
+
+        stmt = (
+            select(DBUserProfile, title.label("title"), skills.label("skills"),
+                   experiences.label("experiences"), projects.label("projects"))
+            .filter(DBUserProfile.user_id == user_id)
+        )
+        result = await self.session.execute(stmt)
+        row = result.first()
+        if row is None:
+            return None
+        db_profile, title_row, skill_rows, experience_rows, project_rows = row
+        return ProfileSnapshot(
+            profile=self._profile(db_profile),
+            title=self._title(user_id, title_row) if title_row else None,
+            skills=[Skill(id=s["id"], user_id=user_id, skill_type=s["skill_type"], skills=s["skills"]) for s in skill_rows],
+            experiences=[self._experience(user_id, e) for e in experience_rows],
+            projects=[self._project(user_id, p) for p in project_rows],
+        )
+
+    def _profile(self, db_profile: DBUserProfile) -> UserProfile:
+        return UserProfile(
+            id=db_profile.id,
+            user_id=db_profile.user_id,
+            name=db_profile.name,
+            email=db_profile.email,
+            headline=db_profile.headline,
+            about_text=db_profile.about_text,
+            location=db_profile.location,
+            years_of_experience=db_profile.years_of_experience,
+            profile_picture=db_profile.profile_picture,
+            created_at=db_profile.created_at,
+            updated_at=db_profile.updated_at
+        )
+
+    def _title(self, user_id: str, row: Dict) -> Title:
+        embedding = row["description_embedding"]
+        return Title(
+            id=row["id"],
+            user_id=user_id,
+            title_name=row["title_name"],
+            description=row["description"],
+            priority=row["priority"],
+            # vector's text form is a JSON array
+            description_embedding=json.loads(embedding) if embedding else None
+        )
+
+    def _experience(self, user_id: str, row: Dict) -> Expriance:
+        return Expriance(
+            id=row["id"],
+            user_id=user_id,
+            company_name=row["company_name"],
+            employement_type=row["employement_type"],
+            role_title=row["role_title"],
+            short_description=row["short_description"],
+            start_date=parse_timestamp(row["start_date"]),
+            end_date=parse_timestamp(row["end_date"]),
+            tech_stack=row["tech_stack"]
+        )
+
+    def _project(self, user_id: str, row: Dict) -> Project:
+        return Project(
+            id=row["id"],
+            user_id=user_id,
+            name=row["name"],
+            short_description=row["short_description"],
+            repo_url=row["repo_url"],
+            status=row["status"],
+            project_description=[ProjectDescription(d["type"], d["text"]) for d in row["descriptions"]],
+            score=row.get("score")
+        )
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Collection, Dict, List, Optional, Tuple
+import numpy as np
+from App.profile_management.domain.entities.models import Project
+
+
+class UserVectorIndex:
+    """All description vectors of one user's projects as a contiguous float32 matrix.
+
+    Rows are L2-normalized, so cosine similarity against a query is a single
+    matrix-vector product; each project's score is its best (weighted) description.
+    """
+
+    def __init__(self, projects: List[Project], project_ids: List[int], embedding_types: List[str], vectors):
+        self.projects = {p.id: p for p in projects}
+        self.embedding_types = np.asarray(embedding_types, dtype=object)
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(project_ids), -1) if project_ids else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.vectors = np.ascontiguousarray(matrix / np.where(norms == 0, 1, norms))
+        # Every project is ranked, including ones without a vector yet (they come last, unscored)
+        self.unique_ids = np.unique(np.asarray(list(self.projects) + list(project_ids), dtype=np.int64))
+        self.row_project = np.searchsorted(self.unique_ids, np.asarray(project_ids, dtype=np.int64))
+
+    def rank(self, embedding: List[float], limit: int, type_weights: Optional[Dict[str, float]] = None,
+             boosts: Optional[Dict[int, float]] = None,
+             candidates: Optional[Collection[int]] = None) -> List[Tuple[int, Optional[float]]]:
+        """(project_id, score) of the top `limit` projects, best first.
+
+        `boosts` is added to a project's score after picking its best description, and with
+        `candidates` only those projects are ranked at all. Projects without a vector come
+        last with a None score, like NULLS LAST in SQL.
+        """
+        if not len(self.unique_ids):
+            return []
+        best = np.full(len(self.unique_ids), -np.inf, dtype=np.float32)
+        if len(self.row_project):
+            query = np.asarray(embedding, dtype=np.float32)
+            query = query / (np.linalg.norm(query) or 1)
+            similarity = self.vectors @ query
+            if type_weights:
+                weights = np.array([type_weights.get(t, 1.0) for t in self.embedding_types], dtype=np.float32)
+                similarity = similarity * weights
+            np.maximum.at(best, self.row_project, similarity)
+        if boosts:
+            best += np.array([boosts.get(int(project_id), 0.0) for project_id in self.unique_ids], dtype=np.float32)
+        order = np.argsort(-best, kind="stable")
+        if candidates is not None:
+            order = order[np.isin(self.unique_ids[order], list(candidates))]
+        return [(int(self.unique_ids[i]), float(best[i]) if np.isfinite(best[i]) else None) for i in order[:limit]]
+
+
+class UserVectorIndexCache:
+    """Per-user UserVectorIndex instances for this process, LRU-bounded by user count.
+
+    Entries are dropped explicitly when a user's projects or descriptions change in this
+    process, and expire after ttl_seconds to pick up vectors the worker wrote since (and
+    writes handled by other API processes).
+    """
+
+    def __init__(self, max_users: int = 1000, ttl_seconds: float = 300):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user_id -> (loaded_at, UserVectorIndex)
+        self._project_owner = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[UserVectorIndex]:
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+            self.misses += 1
+            if entry is not None:
+                self.invalidate(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: str, index: UserVectorIndex):
+        self._entries[user_id] = (time.monotonic(), index)
+        self._entries.move_to_end(user_id)
+        for project_id in index.projects:
+            self._project_owner[project_id] = user_id
+        while len(self._entries) > self.max_users:
+            self.invalidate(next(iter(self._entries)))
+
+    def invalidate(self, user_id: str):
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            for project_id in entry[1].projects:
+                self._project_owner.pop(project_id, None)
+
+    def invalidate_project(self, project_id: int):
+        user_id = self._project_owner.get(project_id)
+        if user_id is not None:
+            self.invalidate(user_id)
@@ -1,18 +1,26 @@
-from App.profile_management.domain.interfaces.repositories import ProfileRepository, TitleRepository, SkillRepository, ProjectRepository, ExprianceRepository
-from App.profile_management.domain.entities.models import UserProfile
+import time
+import asyncio
+from typing import Any, Awaitable, Dict, List, Optional
+from App.profile_management.domain.interfaces.repositories import ProfileRepository, TitleRepository, SkillRepository, ProjectRepository, ExprianceRepository, ProfileSnapshotRepository
+from App.profile_management.domain.entities.models import UserProfile, Title, Skill, Project, Expriance
 from App.resume_genetor.domain.interfaces.ai_service_interface import AiServiceInterface
 from App.resume_genetor.domain.models.model import TitleForAi
 from App.resume_genetor.domain.interfaces.embeding_service import EmbeddingService
 
 
 class ResumeUseCase:
+    # Independent reads run concurrently, so each repository must be bound to its own
+    # session: an AsyncSession can't run two statements at once
     def __init__(self, profile_repo: ProfileRepository, 
                  ai_service: AiServiceInterface, 
                  title_repo: TitleRepository, 
                  skill_repo: SkillRepository,
                  project_repo: ProjectRepository,
                  expriance_repo: ExprianceRepository,
-                 embedding_service: EmbeddingService
+                 embedding_service: Optional[EmbeddingService] = None,
+                 max_projects: int = 5,
+                 max_experiences: int = 5,
+                 snapshot_repo: Optional[ProfileSnapshotRepository] = None
                  ):
         self.profile_repo = profile_repo
         self.ai_service = ai_service
@@ -21,24 +29,151 @@ class ResumeUseCase:
         self.project_repo = project_repo
         self.expriance_repo = expriance_repo
         self.embedding_service = embedding_service
+        # Caps on what goes into the prompt; only the most relevant entries are sent to the LLM
+        self.max_projects = max_projects
+        self.max_experiences = max_experiences
+        # When set, generate_resume loads profile, top title, skills, experiences and
+        # projects with one query instead of one query per repository
+        self.snapshot_repo = snapshot_repo
+
+    async def generate_resume(self, user_id: str, debug: bool = False) -> Any:
+        """Generate the resume for the user's highest-priority title.
+
+        With debug=True, returns {"resume": ..., "timings": {stage: milliseconds}} instead,
+        where "pre_llm" is the wall-clock time until the prompt data was ready.
+        """
+        timings = {}
+        started = time.perf_counter()
+        snapshot = None
+        # Whether the snapshot already holds the top entries ranked against the stored title vector
+        ranked = False
+        if self.snapshot_repo:
+            snapshot = await self._timed(timings, "snapshot", self.snapshot_repo.get_by_user_id(
+                user_id, self.max_projects, self.max_experiences))
+            if not snapshot:
+                raise ValueError("User profile not found")
+            profile, title, skills = snapshot.profile, snapshot.title, snapshot.skills
+            ranked = title is not None and title.description_embedding is not None
+            emb = None if ranked else await self._title_embedding(title, timings)
+        else:
+            # Profile and skills load while titles load and, if needed, the title gets embedded
+            profile, (title, emb), skills = await asyncio.gather(
+                self._timed(timings, "profile", self.profile_repo.get_by_user_id(user_id)),
+                self._top_title_embedding(user_id, timings),
+                self._timed(timings, "skills", self.skill_repo.get_all(user_id)),
+            )
+            if not profile:
+                raise ValueError("User profile not found")
+
+        if ranked:
+            projects, expriances = snapshot.projects, snapshot.experiences
+        elif emb is not None:
+            # Projects attached to the title (or sharing their tags) are boosted over pure similarity
+            projects, expriances = await asyncio.gather(
+                self._timed(timings, "projects", self.project_repo.filter_projects_by_embedding(
+                    user_id, emb, self.max_projects, title_id=title.id)),
+                self._timed(timings, "experiences", self.expriance_repo.filter_experiences_by_embedding(
+                    user_id, emb, self.max_experiences)),
+            )
+        elif snapshot:
+            projects, expriances = snapshot.projects[:self.max_projects], snapshot.experiences
+        else:
+            # Without a query vector, keep the most recent experiences
+            projects, expriances = await asyncio.gather(
+                self._timed(timings, "projects", self.project_repo.get_all(user_id)),
+                self._timed(timings, "experiences", self.expriance_repo.get_all(user_id)),
+            )
+            projects = projects[:self.max_projects]
+        data = self._resume_data(profile, skills, title, projects, expriances)
+        timings["pre_llm"] = self._elapsed_ms(started)
+
+        resume = await self._timed(timings, "llm", self.ai_service.generate_resume(data))
+        if debug:
+            return {"resume": resume, "timings": timings}
+        return resume
 
-    async def generate_resume(self, user_id: str) -> str:
-        # Fetch user profile and related data
-        profile = await self.profile_repo.get_by_user_id(user_id)
+    async def _top_title_embedding(self, user_id: str, timings: Dict[str, float]):
+        titles = await self._timed(timings, "titles", self.title_repo.get_all(user_id))
+        titles.sort(key= lambda t: t.priority, reverse=True)
+        title = titles[0] if titles else None
+        return title, await self._title_embedding(title, timings)
+
+    async def _title_embedding(self, title: Optional[Title], timings: Dict[str, float]):
+        # The worker precomputes title embeddings; only fall back to inference if one is
+        # configured and the current description hasn't been embedded yet
+        emb = title.description_embedding if title else None
+        if emb is None and self.embedding_service and title and title.description:
+            emb = await self._timed(timings, "embedding", self.embedding_service.embade_text(title.description))
+        return emb
+
+    async def _timed(self, timings: Dict[str, float], stage: str, awaitable: Awaitable):
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = self._elapsed_ms(started)
+
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    async def generate_resumes(self, user_id: str) -> Dict[str, str]:
+        """Generate one resume per title of the user, keyed by title name.
+
+        Projects and experiences for every title are ranked together: one query per
+        repository regardless of how many titles the user has.
+        """
+        profile, titles, skills = await asyncio.gather(
+            self.profile_repo.get_by_user_id(user_id),
+            self.title_repo.get_all(user_id),
+            self.skill_repo.get_all(user_id),
+        )
         if not profile:
             raise ValueError("User profile not found")
-        titles= await self.title_repo.get_all(user_id)
-        skills= await self.skill_repo.get_all(user_id)
-
-
-
-        titles.sort(key= lambda t: t.priority, reverse=True)
-
-        emb= await self.embedding_service.embade_text(titles[0].description)
-
-        projects = await self.project_repo.filter_projects_by_embedding(user_id, emb, 5)
-        expriances= await self.expriance_repo.get_all(user_id)
-
+        titles.sort(key=lambda t: t.priority, reverse=True)
+
+        embeddings = [t.description_embedding for t in titles]
+        missing = [i for i, t in enumerate(titles) if t.description_embedding is None and t.description]
+        if missing and self.embedding_service:
+            vectors = await self.embedding_service.embed_many([titles[i].description for i in missing])
+            for i, vector in zip(missing, vectors):
+                embeddings[i] = vector
+
+        ranked = [i for i, emb in enumerate(embeddings) if emb is not None]
+        projects_by_title = {}
+        expriances_by_title = {}
+        if ranked:
+            queries = [embeddings[i] for i in ranked]
+            project_sets, expriance_sets = await asyncio.gather(
+                # Each title's own linked projects (and their tags) are boosted, as in generate_resume
+                self.project_repo.filter_projects_by_embeddings(
+                    user_id, queries, self.max_projects, title_ids=[titles[i].id for i in ranked]),
+                self.expriance_repo.filter_experiences_by_embeddings(user_id, queries, self.max_experiences),
+            )
+            for i, projects, expriances in zip(ranked, project_sets, expriance_sets):
+                projects_by_title[i] = projects
+                expriances_by_title[i] = expriances
+        # Titles without a vector fall back to the unranked lists, fetched only if needed
+        unranked_projects, unranked_expriances = [], []
+        if len(ranked) < len(titles):
+            unranked_projects, unranked_expriances = await asyncio.gather(
+                self.project_repo.get_all(user_id), self.expriance_repo.get_all(user_id)
+            )
+            unranked_projects = unranked_projects[:self.max_projects]
+
+        resumes = {}
+        for i, title in enumerate(titles):
+            projects = projects_by_title.get(i, unranked_projects)
+            expriances = list(expriances_by_title.get(i, unranked_expriances))
+            data = self._resume_data(profile, skills, title, projects, expriances)
+            resumes[title.title_name] = await self.ai_service.generate_resume(data)
+        return resumes
+
+    def _resume_data(self, profile: UserProfile, skills: List[Skill], title: Optional[Title],
+                     projects: List[Project], expriances: List[Expriance]) -> Dict:
+        # Present experiences chronologically, most recent first
+        expriances.sort(key=lambda e: e.start_date, reverse=True)
+        expriances = expriances[:self.max_experiences]
 
         data={
             "name": profile.name,
@@ -51,11 +186,9 @@ class ResumeUseCase:
             "expriances":[{"company":exp.company_name,"position":exp.role_title,"start_date":exp.start_date ,"end_date":exp.end_date if exp.end_date else "Present","description":exp.short_description, "employement_type":exp.employement_type, "tech_stack":exp.tech_stack} for exp in expriances]
             }
 
-        if titles:
-            data["title"]= titles[0].title_name
-
-        resume = await self.ai_service.generate_resume(data)
-        return resume
+        if title:
+            data["title"]= title.title_name
+        return data
 
     async def generate_tags(self, user_id: str) -> str:
         titles= await self.title_repo.get_all(user_id)
@@ -7,4 +7,8 @@ class EmbeddingService(ABC):
     @abstractmethod
     async def embade_text(self, text: str) -> List[float]:
         pass
+
+    @abstractmethod
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        pass
         
\ No newline at end of file
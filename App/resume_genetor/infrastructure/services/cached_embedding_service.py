@@ -0,0 +1,96 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from App.resume_genetor.domain.interfaces.embeding_service import EmbeddingService
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedEmbeddingService(EmbeddingService):
+    """LRU + TTL cache in front of another EmbeddingService.
+
+    Keys are a hash of the model id and the text, values compact float32 arrays. The cache
+    is bounded both by entry count and by total vector bytes; the least recently used
+    entries are evicted first, and entries older than ttl_seconds count as misses.
+    """
+
+    def __init__(self, inner: EmbeddingService, model_id: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.inner = inner
+        self.model_id = model_id or getattr(inner, "model_id", type(inner).__name__)
+        self.max_entries = max_entries or int(os.getenv("QUERY_EMBEDDING_CACHE_ENTRIES", "10000"))
+        self.max_bytes = max_bytes or int(os.getenv("QUERY_EMBEDDING_CACHE_BYTES", str(32 * 1024 * 1024)))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+        self._entries = OrderedDict()  # key -> (stored_at, float32 vector)
+        self.stats = CacheStats()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        stored_at, vector = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return vector
+
+    def _remove(self, key: str):
+        _, vector = self._entries.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= vector.nbytes
+
+    def _put(self, key: str, embedding: List[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic(), vector)
+        self.stats.entries += 1
+        self.stats.bytes += vector.nbytes
+        while self._entries and (self.stats.entries > self.max_entries or self.stats.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    async def embade_text(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self._get(key)
+        if vector is not None:
+            return vector.tolist()
+        embedding = await self.inner.embade_text(text)
+        self._put(key, embedding)
+        return embedding
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        results = [self._get(key) for key in keys]
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            embeddings = await self.inner.embed_many([texts[i] for i in missing])
+            for i, embedding in zip(missing, embeddings):
+                self._put(keys[i], embedding)
+                results[i] = embedding
+        return [r.tolist() if isinstance(r, np.ndarray) else r for r in results]
@@ -1,13 +1,160 @@
-from typing import List
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
 from App.resume_genetor.domain.interfaces.embeding_service import EmbeddingService
 from sentence_transformers import SentenceTransformer
 
+MODEL_NAME = "all-MiniLM-L6-v2"
+# Must match the worker's EMBEDDING_BACKEND so query and stored vectors come from the same runtime
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+
+
+def load_sentence_transformer(backend: str) -> SentenceTransformer:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+    if backend == "onnx":
+        return SentenceTransformer(MODEL_NAME, backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE})
+    return SentenceTransformer(MODEL_NAME)
+
+
+@dataclass
+class EncodeMetrics:
+    """Queue-wait, batching and encode timings of the embedding service, for monitoring."""
+    requests: int = 0
+    in_flight: int = 0
+    batches: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    total_encode_seconds: float = 0.0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.requests if self.requests else 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
 class LocalEmbeddingService(EmbeddingService):
-    def __init__(self):
+    """Embeds texts with a local SentenceTransformer, micro-batching concurrent callers.
+
+    Every text goes onto a queue; a background task collects whatever arrives within
+    max_batch_wait (up to max_batch_size texts), runs one batched encode on the executor
+    and resolves each caller's future. Under load, N concurrent resume requests cost
+    roughly one forward pass instead of N.
+    """
+
+    def __init__(self, backend: Optional[str] = None, max_concurrency: Optional[int] = None, max_pending: Optional[int] = None,
+                 max_batch_size: Optional[int] = None, max_batch_wait: Optional[float] = None):
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.model_id = MODEL_NAME if self.backend == "torch" else f"{MODEL_NAME}/{self.backend}"
         # Load the model once when the service starts up, not on every request!
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        
+        self.model = load_sentence_transformer(self.backend)
+
+        # Encoding runs on its own threads so a forward pass never blocks the event loop;
+        # texts beyond max_pending wait on the semaphore instead of piling up in the queue
+        self.max_concurrency = max_concurrency or int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "2"))
+        self.max_pending = max_pending or int(os.getenv("EMBEDDING_MAX_PENDING", "64"))
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+        self.max_batch_wait = max_batch_wait if max_batch_wait is not None else float(os.getenv("EMBEDDING_MAX_BATCH_WAIT_MS", "5")) / 1000
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embedding")
+        # Created on first use, inside the serving event loop
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._running_batches = set()
+        self._metrics_lock = threading.Lock()
+        self.metrics = EncodeMetrics()
+
+    def _ensure_started(self):
+        if self._batcher is None or self._batcher.done():
+            self._pending = asyncio.Semaphore(self.max_pending)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.ensure_future(self._batch_loop())
+
+    def _encode(self, texts: List[str], submitted: List[float]):
+        started = time.perf_counter()
+        try:
+            # Unit-length queries match the normalized vectors stored by the worker, so inner product == cosine
+            return self.model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+        finally:
+            finished = time.perf_counter()
+            with self._metrics_lock:
+                waits = [started - t for t in submitted]
+                self.metrics.requests += len(texts)
+                self.metrics.batches += 1
+                self.metrics.total_wait_seconds += sum(waits)
+                self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, *waits)
+                self.metrics.total_encode_seconds += finished - started
+
+    def _drain(self, items):
+        while len(items) < self.max_batch_size and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+
+    async def _batch_loop(self):
+        while True:
+            items = [await self._queue.get()]
+            self._drain(items)
+            if len(items) < self.max_batch_size and self.max_batch_wait > 0:
+                await asyncio.sleep(self.max_batch_wait)
+                self._drain(items)
+
+            # At most max_concurrency batches on the executor; later arrivals keep queueing meanwhile
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(items))
+            self._running_batches.add(task)
+            task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, items):
+        texts = [text for text, _, _ in items]
+        submitted = [t for _, t, _ in items]
+        futures = [future for _, _, future in items]
+        try:
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(self._executor, self._encode, texts, submitted)
+            for future, vector in zip(futures, vectors):
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+            for _ in items:
+                self._pending.release()
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            await self._pending.acquire()
+            future = loop.create_future()
+            self._queue.put_nowait((text, time.perf_counter(), future))
+            futures.append(future)
+
+        self.metrics.in_flight += len(futures)
+        try:
+            vectors = await asyncio.gather(*futures)
+        finally:
+            self.metrics.in_flight -= len(futures)
+        return [vector.tolist() for vector in vectors]
+
     async def embade_text(self, text: str) -> List[float]:
-        # Encode the text and convert to a list
-        embedding = self.model.encode(text)
-        return embedding.tolist()
\ No newline at end of file
+        return (await self.embed_many([text]))[0]
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._executor.shutdown(wait=False)
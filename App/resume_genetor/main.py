@@ -1,8 +1,7 @@
 from App.resume_genetor.application.usecase.resume_usecase import ResumeUseCase
-from App.profile_management.infrastructure.repositories.sql_repositories import SqlAlchemyProfileRepository, SqlAlchemyTitleRepository, SqlAlchemySkillRepository, SqlAlchemyProjectRepository, SqlAlchemyExprianceRepository
+from App.profile_management.infrastructure.repositories.sql_repositories import SqlAlchemyProfileRepository, SqlAlchemyTitleRepository, SqlAlchemySkillRepository, SqlAlchemyProjectRepository, SqlAlchemyExprianceRepository, SqlAlchemyProfileSnapshotRepository
 from App.profile_management.infrastructure.database.database import get_db
 from App.resume_genetor.infrastructure.services.ai_service import AiService
-from App.resume_genetor.infrastructure.services.embedding_service import LocalEmbeddingService
 import os
 import jwt
 from dotenv import load_dotenv
@@ -20,28 +19,31 @@ user_id: str = "64d3ec52-f3fa-4dd6-bd41-6cc19f6edb36"
 
 
 async def test_generate_resume():
-    db = None
+    sessions = []
     try:
-        # Get database session
-        db = await get_db()
-        
-        # Create repository with the session
-        repo = SqlAlchemyProfileRepository(db)
-        title_repo = SqlAlchemyTitleRepository(db)
-        skill_repo = SqlAlchemySkillRepository(db)
+        # One pooled session per repository: the use case runs their reads concurrently
+        sessions = await asyncio.gather(*(get_db() for _ in range(5)))
+        profile_db, title_db, skill_db, expriance_db, project_db = sessions
+
+        # Create repositories with their sessions
+        repo = SqlAlchemyProfileRepository(profile_db)
+        title_repo = SqlAlchemyTitleRepository(title_db)
+        skill_repo = SqlAlchemySkillRepository(skill_db)
         ai_service = AiService()
-        expriance_repo = SqlAlchemyExprianceRepository(db)
-        project_repo = SqlAlchemyProjectRepository(db)
-        embedding_service = LocalEmbeddingService()
+        expriance_repo = SqlAlchemyExprianceRepository(expriance_db)
+        project_repo = SqlAlchemyProjectRepository(project_db)
         
         # Create use case
-        resume_use_case = ResumeUseCase(profile_repo=repo, ai_service=ai_service, title_repo=title_repo, skill_repo=skill_repo, expriance_repo=expriance_repo, project_repo=project_repo, embedding_service=embedding_service)
+        resume_use_case = ResumeUseCase(profile_repo=repo, ai_service=ai_service, title_repo=title_repo, skill_repo=skill_repo, expriance_repo=expriance_repo, project_repo=project_repo,
+                                       snapshot_repo=SqlAlchemyProfileSnapshotRepository(profile_db))
 
 
       
         
         
-        resume = await resume_use_case.generate_resume(user_id)
+        result = await resume_use_case.generate_resume(user_id, debug=True)
+        resume = result["resume"]
+        print(f"Timings (ms): {result['timings']}")
 
 
 
@@ -65,8 +67,8 @@ async def test_generate_resume():
         print(f"Error generating resume: {e}")
         raise
     finally:
-        # Ensure database session is closed
-        if db:
+        # Ensure database sessions are closed
+        for db in sessions:
             await db.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import AsyncMock
+from App.resume_genetor.application.usecase.resume_usecase import ResumeUseCase
+from datetime import datetime
+from App.profile_management.domain.entities.models import UserProfile, Title, Project, Expriance, ProfileSnapshot
+
+@pytest.fixture
+def repos():
+    profile_repo = AsyncMock()
+    profile_repo.get_by_user_id.return_value = UserProfile(user_id="u1", name="Test", email="test@test.com")
+    title_repo = AsyncMock()
+    skill_repo = AsyncMock()
+    skill_repo.get_all.return_value = []
+    project_repo = AsyncMock()
+    project_repo.filter_projects_by_embedding.return_value = [Project(user_id="u1", name="P1")]
+    project_repo.get_all.return_value = [Project(user_id="u1", name="P2")]
+    expriance_repo = AsyncMock()
+    expriance_repo.get_all.return_value = []
+    expriance_repo.filter_experiences_by_embedding.return_value = []
+    ai_service = AsyncMock()
+    ai_service.generate_resume.return_value = {"professional_summary": "..."}
+    return dict(profile_repo=profile_repo, title_repo=title_repo, skill_repo=skill_repo,
+                project_repo=project_repo, expriance_repo=expriance_repo, ai_service=ai_service)
+
+@pytest.mark.asyncio
+async def test_generate_resume_uses_precomputed_title_embedding(repos):
+    embedding_service = AsyncMock()
+    repos["title_repo"].get_all.return_value = [
+        Title(title_name="Backend", user_id="u1", description="APIs", priority=2, description_embedding=[0.1, 0.2], id=3),
+        Title(title_name="Frontend", user_id="u1", description="UIs", priority=1),
+    ]
+    use_case = ResumeUseCase(embedding_service=embedding_service, **repos)
+
+    await use_case.generate_resume("u1")
+
+    embedding_service.embade_text.assert_not_called()
+    repos["project_repo"].filter_projects_by_embedding.assert_called_once_with("u1", [0.1, 0.2], 5, title_id=3)
+    data = repos["ai_service"].generate_resume.call_args.args[0]
+    assert data["title"] == "Backend"
+
+@pytest.mark.asyncio
+async def test_generate_resume_without_title_embedding_or_service(repos):
+    repos["title_repo"].get_all.return_value = [Title(title_name="Backend", user_id="u1", description="APIs")]
+    use_case = ResumeUseCase(**repos)
+
+    await use_case.generate_resume("u1")
+
+    repos["project_repo"].filter_projects_by_embedding.assert_not_called()
+    data = repos["ai_service"].generate_resume.call_args.args[0]
+    assert [p["name"] for p in data["projects"]] == ["P2"]
+
+@pytest.mark.asyncio
+async def test_generate_resume_sends_only_top_ranked_experiences(repos):
+    def exp(company, year):
+        return Expriance(company_name=company, employement_type="Full-time", role_title="Engineer",
+                         short_description="...", start_date=datetime(year, 1, 1), user_id="u1")
+    repos["title_repo"].get_all.return_value = [
+        Title(title_name="Backend", user_id="u1", description="APIs", description_embedding=[0.1, 0.2])
+    ]
+    repos["expriance_repo"].filter_experiences_by_embedding.return_value = [exp("Old", 2015), exp("New", 2022)]
+    use_case = ResumeUseCase(max_experiences=2, **repos)
+
+    await use_case.generate_resume("u1")
+
+    repos["expriance_repo"].filter_experiences_by_embedding.assert_called_once_with("u1", [0.1, 0.2], 2)
+    repos["expriance_repo"].get_all.assert_not_called()
+    data = repos["ai_service"].generate_resume.call_args.args[0]
+    assert [e["company"] for e in data["expriances"]] == ["New", "Old"]
+
+@pytest.mark.asyncio
+async def test_generate_resumes_ranks_all_titles_in_one_call(repos):
+    embedding_service = AsyncMock()
+    embedding_service.embed_many.return_value = [[0.3, 0.4]]
+    repos["title_repo"].get_all.return_value = [
+        Title(title_name="Frontend", user_id="u1", description="UIs", priority=1, id=4),
+        Title(title_name="Backend", user_id="u1", description="APIs", priority=2, description_embedding=[0.1, 0.2], id=3),
+    ]
+    repos["project_repo"].filter_projects_by_embeddings.return_value = [
+        [Project(user_id="u1", name="API")], [Project(user_id="u1", name="UI")]
+    ]
+    repos["expriance_repo"].filter_experiences_by_embeddings.return_value = [[], []]
+    use_case = ResumeUseCase(embedding_service=embedding_service, **repos)
+
+    resumes = await use_case.generate_resumes("u1")
+
+    embedding_service.embed_many.assert_called_once_with(["UIs"])
+    repos["project_repo"].filter_projects_by_embeddings.assert_called_once_with(
+        "u1", [[0.1, 0.2], [0.3, 0.4]], 5, title_ids=[3, 4])
+    repos["project_repo"].get_all.assert_not_called()
+    sent = [call.args[0] for call in repos["ai_service"].generate_resume.call_args_list]
+    assert [(d["title"], [p["name"] for p in d["projects"]]) for d in sent] == [("Backend", ["API"]), ("Frontend", ["UI"])]
+    assert set(resumes) == {"Backend", "Frontend"}
+
+@pytest.mark.asyncio
+async def test_generate_resume_debug_returns_stage_timings(repos):
+    embedding_service = AsyncMock()
+    embedding_service.embade_text.return_value = [0.5, 0.5]
+    repos["title_repo"].get_all.return_value = [Title(title_name="Backend", user_id="u1", description="APIs")]
+    use_case = ResumeUseCase(embedding_service=embedding_service, **repos)
+
+    result = await use_case.generate_resume("u1", debug=True)
+
+    assert result["resume"] == {"professional_summary": "..."}
+    assert set(result["timings"]) == {"profile", "titles", "skills", "embedding", "projects", "experiences", "pre_llm", "llm"}
+    repos["project_repo"].filter_projects_by_embedding.assert_called_once_with("u1", [0.5, 0.5], 5, title_id=None)
+
+@pytest.mark.asyncio
+async def test_generate_resume_from_snapshot_skips_per_repository_reads(repos):
+    snapshot_repo = AsyncMock()
+    snapshot_repo.get_by_user_id.return_value = ProfileSnapshot(
+        profile=UserProfile(user_id="u1", name="Test", email="test@test.com"),
+        title=Title(title_name="Backend", user_id="u1", description="APIs", id=3),
+        projects=[Project(user_id="u1", name="P3")],
+    )
+    use_case = ResumeUseCase(snapshot_repo=snapshot_repo, **repos)
+
+    await use_case.generate_resume("u1")
+
+    for repo in ("profile_repo", "title_repo", "skill_repo"):
+        repos[repo].get_all.assert_not_called()
+    repos["profile_repo"].get_by_user_id.assert_not_called()
+    repos["project_repo"].get_all.assert_not_called()
+    data = repos["ai_service"].generate_resume.call_args.args[0]
+    assert data["title"] == "Backend" and [p["name"] for p in data["projects"]] == ["P3"]
+
+@pytest.mark.asyncio
+async def test_generate_resume_uses_snapshot_ranking_with_stored_title_vector(repos):
+    snapshot_repo = AsyncMock()
+    snapshot_repo.get_by_user_id.return_value = ProfileSnapshot(
+        profile=UserProfile(user_id="u1", name="Test", email="test@test.com"),
+        title=Title(title_name="Backend", user_id="u1", description="APIs", id=3, description_embedding=[0.1, 0.2]),
+        projects=[Project(user_id="u1", name="P3", score=0.9)],
+    )
+    use_case = ResumeUseCase(snapshot_repo=snapshot_repo, max_projects=2, max_experiences=3, **repos)
+
+    await use_case.generate_resume("u1")
+
+    snapshot_repo.get_by_user_id.assert_called_once_with("u1", 2, 3)
+    repos["project_repo"].filter_projects_by_embedding.assert_not_called()
+    repos["expriance_repo"].filter_experiences_by_embedding.assert_not_called()
+    data = repos["ai_service"].generate_resume.call_args.args[0]
+    assert [p["name"] for p in data["projects"]] == ["P3"]
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from App.resume_genetor.infrastructure.services.cached_embedding_service import CachedEmbeddingService
+
+@pytest.fixture
+def inner():
+    service = MagicMock()
+    service.model_id = "test-model"
+    service.embade_text = AsyncMock(side_effect=lambda text: [float(len(text)), 1.0])
+    service.embed_many = AsyncMock(side_effect=lambda texts: [[float(len(t)), 1.0] for t in texts])
+    return service
+
+@pytest.mark.asyncio
+async def test_repeated_text_is_served_from_cache(inner):
+    service = CachedEmbeddingService(inner, max_entries=10, max_bytes=1024, ttl_seconds=60)
+
+    first = await service.embade_text("backend engineer")
+    second = await service.embade_text("backend engineer")
+
+    assert first == second == [16.0, 1.0]
+    inner.embade_text.assert_called_once()
+    assert service.stats.hits == 1
+    assert service.stats.misses == 1
+    assert service.stats.bytes == 8  # two float32 values
+
+@pytest.mark.asyncio
+async def test_lru_entry_evicted_when_over_capacity(inner):
+    service = CachedEmbeddingService(inner, max_entries=2, max_bytes=1024, ttl_seconds=60)
+
+    await service.embade_text("a")
+    await service.embade_text("b")
+    await service.embade_text("a")
+    await service.embade_text("c")  # evicts "b", the least recently used
+
+    assert service.stats.evictions == 1
+    await service.embade_text("a")
+    await service.embade_text("b")
+    assert inner.embade_text.call_count == 4
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_a_miss(inner):
+    service = CachedEmbeddingService(inner, max_entries=10, max_bytes=1024, ttl_seconds=0)
+
+    await service.embade_text("a")
+    await service.embade_text("a")
+
+    assert service.stats.expirations == 1
+    assert inner.embade_text.call_count == 2
+
+@pytest.mark.asyncio
+async def test_embed_many_only_forwards_misses(inner):
+    service = CachedEmbeddingService(inner, max_entries=10, max_bytes=1024, ttl_seconds=60)
+    await service.embade_text("ab")
+
+    result = await service.embed_many(["ab", "abc"])
+
+    assert result == [[2.0, 1.0], [3.0, 1.0]]
+    inner.embed_many.assert_called_once_with(["abc"])
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+from unittest.mock import patch
+from App.resume_genetor.infrastructure.services.embedding_service import LocalEmbeddingService
+
+class FakeModel:
+    """Encodes a text as [len(text), 1.0] and records the texts of every encode call."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+        self.release = threading.Event()
+        self.release.set()
+
+    def encode(self, texts, batch_size, normalize_embeddings):
+        self.release.wait(5)
+        self.batches.append(list(texts))
+        if self.error:
+            raise self.error
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+def make_service(model, **kwargs):
+    with patch("App.resume_genetor.infrastructure.services.embedding_service.load_sentence_transformer",
+               return_value=model):
+        return LocalEmbeddingService(backend="torch", **kwargs)
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_encode():
+    model = FakeModel()
+    service = make_service(model, max_batch_wait=0.05)
+
+    vectors = await asyncio.gather(*(service.embade_text("x" * n) for n in range(1, 6)))
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len(model.batches) == 1 and len(model.batches[0]) == 5
+    assert service.metrics.batches == 1 and service.metrics.avg_batch_size == 5
+    service.close()
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size():
+    model = FakeModel()
+    service = make_service(model, max_batch_size=2, max_batch_wait=0.05)
+
+    vectors = await service.embed_many(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert sorted(len(batch) for batch in model.batches) == [1, 2, 2]
+    service.close()
+
+@pytest.mark.asyncio
+async def test_encode_error_reaches_every_caller_in_the_batch():
+    model = FakeModel(error=RuntimeError("model failed"))
+    service = make_service(model, max_batch_wait=0.05)
+
+    results = await asyncio.gather(*(service.embade_text(t) for t in ("a", "b", "c")), return_exceptions=True)
+
+    assert len(model.batches) == 1
+    assert all(isinstance(r, RuntimeError) and str(r) == "model failed" for r in results)
+    # The batcher survives the failure
+    model.error = None
+    assert await service.embade_text("dd") == [2.0, 1.0]
+    service.close()
+
+@pytest.mark.asyncio
+async def test_pending_slots_are_released_after_success_and_failure():
+    model = FakeModel()
+    service = make_service(model, max_pending=2, max_batch_size=2, max_batch_wait=0)
+
+    # More texts than max_pending: later ones wait for earlier batches to free their slots
+    model.release.clear()
+    call = asyncio.ensure_future(service.embed_many(["a", "b", "c", "d", "e"]))
+    await asyncio.sleep(0.05)
+    assert not call.done() and service._pending.locked()
+    model.release.set()
+    assert len(await asyncio.wait_for(call, timeout=5)) == 5
+
+    model.error = RuntimeError("model failed")
+    with pytest.raises(RuntimeError):
+        await service.embed_many(["f", "g"])
+
+    assert service._pending._value == 2
+    service.close()
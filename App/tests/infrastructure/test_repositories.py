@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from App.profile_management.infrastructure.repositories.sql_repositories import SqlAlchemyProfileRepository, SqlAlchemyTitleRepository, SqlAlchemyProjectRepository, SqlAlchemyTagRepository
-from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag
+from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from App.profile_management.infrastructure.repositories.sql_repositories import SqlAlchemyProfileRepository, SqlAlchemyTitleRepository, SqlAlchemyProjectRepository, SqlAlchemyTagRepository, SqlAlchemyExprianceRepository, SqlAlchemyProfileSnapshotRepository, EMBEDDING_JOBS_CHANNEL
+from App.profile_management.infrastructure.repositories.vector_index import UserVectorIndexCache
+from App.profile_management.domain.entities.models import UserProfile, Title, Project, Tag, Expriance, ProjectEmbedding
 
 @pytest.fixture
 def mock_session():
@@ -65,3 +68,275 @@ async def test_tag_repo_create(mock_session):
     
     mock_session.add.assert_called_once()
     mock_session.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_expriance_repo_create_notifies_worker(mock_session):
+    repo = SqlAlchemyExprianceRepository(mock_session)
+
+    expriance = Expriance(
+        company_name="Acme", employement_type="Full-time", role_title="Engineer",
+        short_description="Built things", start_date=datetime(2020, 1, 1), user_id="u1"
+    )
+
+    await repo.create(expriance)
+
+    stmt, params = mock_session.execute.call_args.args
+    assert "pg_notify" in str(stmt)
+    assert params == {"channel": EMBEDDING_JOBS_CHANNEL, "payload": "experience"}
+    mock_session.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_expriance_repo_update_notifies_only_when_description_changes(mock_session):
+    repo = SqlAlchemyExprianceRepository(mock_session)
+    db_exp = MagicMock(id=1, user_id="u1", short_description="Built things")
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.first.return_value = db_exp
+    mock_session.execute.return_value = mock_result
+
+    expriance = Expriance(
+        company_name="Acme", employement_type="Full-time", role_title="Senior Engineer",
+        short_description="Built things", start_date=datetime(2020, 1, 1), user_id="u1", id=1
+    )
+    await repo.update(expriance)
+    assert mock_session.execute.call_count == 1
+
+    expriance.short_description = "Built and ran things"
+    await repo.update(expriance)
+    stmt, params = mock_session.execute.call_args.args
+    assert "pg_notify" in str(stmt)
+    assert params["payload"] == "experience"
+
+@pytest.mark.asyncio
+async def test_similarity_queries_rank_the_users_rows_exactly(mock_session):
+    project_repo = SqlAlchemyProjectRepository(mock_session, vector_index=None)
+    expriance_repo = SqlAlchemyExprianceRepository(mock_session)
+    mock_result = MagicMock()
+    mock_result.all.return_value = []
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await project_repo.filter_projects_by_embedding("u1", [0.1] * 384, 5)
+    await expriance_repo.hybrid_search_experiences("u1", "kubernetes", [0.1] * 384, 5)
+
+    # No set_config round trips: neither query is served by an HNSW scan
+    assert mock_session.execute.call_count == 2
+    sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ORDER BY CASE WHEN (experiences.embedding_text_hash = experiences.text_hash)" in sql
+
+@pytest.mark.asyncio
+async def test_project_repo_filter_by_embedding_ranks_distinct_projects(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session)
+    db_project = MagicMock(id=7, user_id="u1", status="active", embeddings=[])
+    db_project.name = "P1"
+    mock_result = MagicMock()
+    mock_result.all.return_value = [(db_project, 0.92)]
+    mock_session.execute.return_value = mock_result
+
+    projects = await repo.filter_projects_by_embedding("u1", [0.1] * 384, 5, type_weights={"features": 1.5})
+
+    stmt = mock_session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "max(" in sql and "GROUP BY project_embeddings.project_id" in sql
+    assert "CASE project_embeddings.embedding_type" in sql
+    assert "<#>" in sql and "<=>" not in sql
+    # Vectors of an older description score NULL and sort after every fresh one
+    assert "WHEN (project_embeddings.embedding_text_hash = project_embeddings.text_hash)" in sql
+    assert "ORDER BY score DESC NULLS LAST" in sql
+    # Projects without a vector yet are ranked last rather than dropped
+    assert "embedding IS NOT NULL" not in sql
+    assert [(p.id, p.name, p.score) for p in projects] == [(7, "P1", 0.92)]
+
+@pytest.mark.asyncio
+async def test_expriance_repo_filter_by_embedding_ranks_stale_vectors_last(mock_session):
+    repo = SqlAlchemyExprianceRepository(mock_session)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await repo.filter_experiences_by_embedding("u1", [0.1] * 384, 5)
+
+    sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "CASE WHEN (experiences.embedding_text_hash = experiences.text_hash)" in sql
+    assert "END NULLS LAST" in sql
+
+@pytest.mark.asyncio
+async def test_project_repo_filter_by_embedding_uses_vector_index(mock_session):
+    index = UserVectorIndexCache()
+    repo = SqlAlchemyProjectRepository(mock_session, vector_index=index)
+    near = MagicMock(embedding=[1.0, 0.0], embedding_type="features", raw_text="a", text_hash="h", embedding_text_hash="h")
+    far = MagicMock(embedding=[0.0, 1.0], embedding_type="features", raw_text="b", text_hash="h", embedding_text_hash="h")
+    p1 = MagicMock(id=1, user_id="u1", status="active", embeddings=[far])
+    p2 = MagicMock(id=2, user_id="u1", status="active", embeddings=[near])
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [p1, p2]
+    mock_session.execute.return_value = mock_result
+
+    first = await repo.filter_projects_by_embedding("u1", [0.9, 0.1], 1)
+    second = await repo.filter_projects_by_embedding("u1", [0.1, 0.9], 1)
+
+    assert [p.id for p in first] == [2] and [p.id for p in second] == [1]
+    mock_session.execute.assert_called_once()
+
+    # A vector of an older description isn't used, the project still comes back last and
+    # such an index isn't cached
+    index.invalidate("u1")
+    near.embedding_text_hash = "old"
+    stale = await repo.filter_projects_by_embedding("u1", [0.9, 0.1], 2)
+    assert [(p.id, p.score is None) for p in stale] == [(1, False), (2, True)] and index.get("u1") is None
+
+    await repo.save_embedding(ProjectEmbedding(project_id=2, embedding_type="features", raw_text="c"))
+    assert index.get("u1") is None
+
+@pytest.mark.asyncio
+async def test_project_repo_filter_by_embeddings_single_statement(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session)
+    p1 = MagicMock(id=1, user_id="u1", status="active", embeddings=[])
+    p2 = MagicMock(id=2, user_id="u1", status="active", embeddings=[])
+    mock_result = MagicMock()
+    mock_result.all.return_value = [(1, p2, 0.9), (1, p1, 0.5), (2, p1, 0.8)]
+    mock_session.execute.return_value = mock_result
+
+    ranked = await repo.filter_projects_by_embeddings("u1", [[0.1] * 384, [0.2] * 384], 2, title_ids=[3, 4])
+
+    mock_session.execute.assert_called_once()
+    compiled = mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "unnest" in sql and "WITH ORDINALITY" in sql and "JOIN LATERAL" in sql
+    # Each query vector is boosted by the links of its own title
+    assert "AS queries(title_id, query, position)" in sql
+    assert "title_project.title_id = queries.title_id" in sql
+    assert [3, 4] in compiled.params.values()
+    assert [[(p.id, p.score) for p in projects] for projects in ranked] == [[(2, 0.9), (1, 0.5)], [(1, 0.8)]]
+
+@pytest.mark.asyncio
+async def test_project_repo_filter_by_embedding_blends_title_links(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session, vector_index=None,
+                                       title_link_boost=0.2, tag_match_boost=0.05, title_scope="filter")
+    mock_result = MagicMock()
+    mock_result.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await repo.filter_projects_by_embedding("u1", [0.1] * 384, 5, title_id=3)
+
+    mock_session.execute.assert_called_once()
+    compiled = mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "title_project" in sql and "tag_project" in sql
+    assert "WHERE projects.user_id" in sql and "NOT (EXISTS" in sql
+    assert 0.2 in compiled.params.values() and 0.05 in compiled.params.values()
+
+@pytest.mark.asyncio
+async def test_project_repo_vector_index_applies_title_links(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session, vector_index=UserVectorIndexCache(),
+                                       title_link_boost=0.2, tag_match_boost=0.05, title_scope="boost")
+    def db_project(project_id, vector):
+        emb = MagicMock(embedding=vector, embedding_type="features", raw_text="a", text_hash="h", embedding_text_hash="h")
+        return MagicMock(id=project_id, user_id="u1", status="active", embeddings=[emb])
+    projects = MagicMock()
+    projects.scalars.return_value.all.return_value = [db_project(1, [1.0, 0.0]), db_project(2, [0.9, 0.1]), db_project(3, [0.6, 0.8])]
+    links = MagicMock()
+    links.all.return_value = [(2, True, False), (3, False, True)]
+    mock_session.execute.side_effect = [projects, links, links]
+
+    boosted = await repo.filter_projects_by_embedding("u1", [1.0, 0.0], 3, title_id=7)
+
+    # The linked project overtakes the closest one; the tag match alone does not
+    assert [p.id for p in boosted] == [2, 1, 3]
+    sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "title_project" in sql and "tag_project" in sql
+
+    repo.title_scope = "filter"
+    scoped = await repo.filter_projects_by_embedding("u1", [1.0, 0.0], 3, title_id=7)
+
+    assert [p.id for p in scoped] == [2, 3]
+    assert mock_session.execute.call_count == 3
+
+    # The multi-title path boosts each vector by its own title's links, one query per title
+    mock_session.execute.side_effect = [links, MagicMock(all=MagicMock(return_value=[]))]
+    repo.title_scope = "boost"
+    per_title = await repo.filter_projects_by_embeddings("u1", [[1.0, 0.0], [1.0, 0.0]], 3, title_ids=[7, 8])
+
+    assert [[p.id for p in projects] for projects in per_title] == [[2, 1, 3], [1, 2, 3]]
+    assert mock_session.execute.call_count == 5
+
+@pytest.mark.asyncio
+async def test_project_repo_get_project_by_title_name_single_query(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    assert await repo.get_project_by_title_name("u1", "Backend") is None
+    mock_session.execute.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_project_repo_hybrid_search_fuses_text_and_vector_ranks(mock_session):
+    repo = SqlAlchemyProjectRepository(mock_session)
+    db_project = MagicMock(id=7, user_id="u1", status="active", embeddings=[])
+    mock_result = MagicMock()
+    mock_result.all.return_value = [(db_project, 1 / 61 + 1 / 62)]
+    mock_session.execute.return_value = mock_result
+
+    projects = await repo.hybrid_search_projects("u1", "Kubernetes", [0.1] * 384, 5)
+
+    mock_session.execute.assert_called_once()
+    sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "websearch_to_tsquery" in sql and "@@" in sql and "<#>" in sql
+    assert "FULL OUTER JOIN vector_hits" in sql
+    assert [p.id for p in projects] == [7]
+
+@pytest.mark.asyncio
+async def test_profile_snapshot_repo_loads_everything_in_one_query(mock_session):
+    repo = SqlAlchemyProfileSnapshotRepository(mock_session)
+    db_profile = MagicMock(user_id="u1", email="test@test.com", years_of_experience=3)
+    db_profile.name = "Test"
+    title = {"id": 3, "title_name": "Backend", "description": "APIs", "priority": 2, "description_embedding": "[0.1,0.2]"}
+    skills = [{"id": 1, "skill_type": "Languages", "skills": ["Python"]}]
+    experiences = [{"id": 4, "company_name": "Acme", "employement_type": "Full-time", "role_title": "Engineer",
+                    "short_description": "...", "tech_stack": ["Go"], "start_date": "2022-01-01T00:00:00.000000",
+                    "end_date": None}]
+    projects = [{"id": 7, "name": "P1", "short_description": None, "repo_url": None, "status": "active",
+                 "descriptions": [{"type": "features", "text": "Kubernetes operator"}], "score": 0.9}]
+    mock_result = MagicMock()
+    mock_result.first.return_value = (db_profile, title, skills, experiences, projects)
+    mock_session.execute.return_value = mock_result
+
+    snapshot = await repo.get_by_user_id("u1", max_projects=2, max_experiences=3)
+
+    mock_session.execute.assert_called_once()
+    stmt = mock_session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ORDER BY titles.priority DESC NULLS LAST" in sql and "json_agg" in sql
+    # Projects and experiences are ranked against the stored title vector in the same statement,
+    # and the unranked lists are only aggregated when there is no such vector
+    assert sql.count("<#> (SELECT top_title.embedding") == 2
+    assert "title_project.title_id = (SELECT top_title.id" in sql
+    assert sql.count("CASE WHEN ((SELECT top_title.embedding") == 2
+    assert {2, 3} <= set(stmt.compile(dialect=postgresql.dialect()).params.values())
+    assert snapshot.profile.name == "Test"
+    assert (snapshot.title.id, snapshot.title.description_embedding) == (3, [0.1, 0.2])
+    assert snapshot.skills[0].skills == ["Python"]
+    assert snapshot.experiences[0].start_date == datetime(2022, 1, 1) and snapshot.experiences[0].end_date is None
+    assert snapshot.projects[0].project_description[0].text == "Kubernetes operator"
+    assert snapshot.projects[0].score == 0.9
+
+@pytest.mark.asyncio
+async def test_expriance_repo_filter_by_embeddings_single_statement(mock_session):
+    repo = SqlAlchemyExprianceRepository(mock_session)
+    def db_exp(exp_id):
+        return MagicMock(id=exp_id, user_id="u1", company_name="Acme", employement_type="Full-time", role_title="Engineer",
+                         short_description="...", start_date=datetime(2022, 1, 1), end_date=None, tech_stack=[],
+                         created_at=datetime(2022, 1, 1))
+    mock_result = MagicMock()
+    mock_result.all.return_value = [(1, db_exp(4)), (1, db_exp(5)), (2, db_exp(5))]
+    mock_session.execute.return_value = mock_result
+
+    ranked = await repo.filter_experiences_by_embeddings("u1", [[0.1] * 384, [0.2] * 384], 2)
+
+    mock_session.execute.assert_called_once()
+    sql = str(mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "unnest" in sql and "WITH ORDINALITY" in sql and "JOIN LATERAL" in sql
+    # The lateral top-k reads experiences itself instead of correlating to the outer join
+    lateral = sql[sql.index("JOIN LATERAL"):sql.index(") AS top")]
+    assert "FROM experiences" in lateral
+    assert [[e.id for e in exps] for exps in ranked] == [[4, 5], [5]]
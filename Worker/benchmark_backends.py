@@ -0,0 +1,95 @@
+"""Compare embedding backends: encode throughput, peak RSS and parity with the PyTorch model.
+
+    python benchmark_backends.py --backends torch onnx onnx-int8 --texts 512
+
+Each backend runs in a fresh process so its RSS is not inflated by the others. The
+'torch' backend is the reference: every other backend must produce vectors whose
+cosine similarity to the reference is at least 1 - tolerance, otherwise the script
+exits non-zero.
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import sys
+import time
+import numpy as np
+
+from worker import BACKENDS, BATCH_SIZE, load_model
+
+WORDS = (
+    "built deployed scalable backend service api kubernetes docker postgres redis queue "
+    "react dashboard latency throughput pipeline python fastapi microservices monitoring "
+    "grafana terraform aws lambda ci cd tests coverage refactor migration search vector "
+    "embedding model inference caching authentication payments analytics reporting team"
+).split()
+
+
+def sample_texts(count: int, seed: int = 7):
+    """Deterministic mix of one-line tech stacks and multi-paragraph feature descriptions."""
+    rng = random.Random(seed)
+    lengths = [8, 24, 64, 180, 400]
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.choice(lengths))) for _ in range(count)]
+
+
+def run_backend(backend: str, texts, repeats: int, results):
+    model = load_model(backend)
+    model.encode(texts[:BATCH_SIZE], batch_size=BATCH_SIZE)  # warm-up
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        vectors = model.encode(texts, batch_size=BATCH_SIZE)
+    elapsed = time.perf_counter() - started
+
+    # ru_maxrss is reported in kilobytes on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((backend, len(texts) * repeats / elapsed, rss_mb, np.asarray(vectors, dtype=np.float32)))
+
+
+def cosine(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--texts", type=int, default=512, help="number of synthetic texts to encode")
+    parser.add_argument("--repeats", type=int, default=3, help="timed passes over the texts")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="max allowed 1 - cosine vs. torch")
+    args = parser.parse_args()
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    texts = sample_texts(args.texts)
+    ctx = multiprocessing.get_context("spawn")
+
+    measured = {}
+    for backend in backends:
+        results = ctx.Queue()
+        process = ctx.Process(target=run_backend, args=(backend, texts, args.repeats, results))
+        process.start()
+        name, throughput, rss_mb, vectors = results.get()
+        process.join()
+        measured[name] = (throughput, rss_mb, vectors)
+
+    reference = measured["torch"][2]
+    failed = False
+    print(f"{'backend':<10} {'texts/sec':>10} {'peak RSS MB':>12} {'min cosine':>11} {'mean cosine':>12}")
+    for backend in backends:
+        throughput, rss_mb, vectors = measured[backend]
+        similarity = cosine(vectors, reference)
+        ok = similarity.min() >= 1 - args.tolerance
+        failed = failed or not ok
+        print(
+            f"{backend:<10} {throughput:>10.1f} {rss_mb:>12.0f} {similarity.min():>11.4f} "
+            f"{similarity.mean():>12.4f}{'' if ok else '  FAIL'}"
+        )
+
+    if failed:
+        print(f"Parity check failed: some vectors deviate more than {args.tolerance} from torch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
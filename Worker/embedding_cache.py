@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from sqlalchemy import select, Table, Column, String, DateTime, func
+from sqlalchemy.dialects.postgresql import insert
+from pgvector.sqlalchemy import Vector
+
+
+def normalize_text(text: str) -> str:
+    # Whitespace-only differences (trailing newlines, double spaces) don't change the meaning
+    return " ".join(text.split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def cache_table(metadata, dim: int) -> Table:
+    return Table(
+        'embedding_cache', metadata,
+        Column('text_hash', String(64), primary_key=True),
+        Column('model_name', String(255), primary_key=True),
+        Column('embedding', Vector(dim), nullable=False),
+        Column('created_at', DateTime, nullable=False, server_default=func.now())
+    )
+
+
+class EmbeddingCache:
+    """Content-addressed vectors: in-process LRU in front of the shared embedding_cache table.
+
+    Safe to share between the claiming thread and the writer thread of one worker.
+    """
+
+    def __init__(self, table: Table, model_name: str, max_entries: int = 10000):
+        self.table = table
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.encoded = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of looked-up texts that did not need a forward pass."""
+        return (self.lookups - self.encoded) / self.lookups if self.lookups else 0.0
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get_many(self, session, keys) -> dict:
+        """Return {hash: vector} for every key that is already cached."""
+        found = {}
+        missing = set()
+        with self._lock:
+            self.lookups += len(keys)
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                else:
+                    missing.add(key)
+
+        if missing:
+            stmt = (
+                select(self.table.c.text_hash, self.table.c.embedding)
+                .where(self.table.c.model_name == self.model_name)
+                .where(self.table.c.text_hash.in_(missing))
+            )
+            for row in session.execute(stmt):
+                found[row.text_hash] = row.embedding
+                self._remember(row.text_hash, row.embedding)
+        return found
+
+    def put_many(self, session, vectors_by_key: dict):
+        """Store freshly encoded vectors; committed together with the caller's write-back."""
+        if not vectors_by_key:
+            return
+        with self._lock:
+            self.encoded += len(vectors_by_key)
+        stmt = insert(self.table).on_conflict_do_nothing(index_elements=['text_hash', 'model_name'])
+        session.execute(stmt, [
+            {"text_hash": key, "model_name": self.model_name, "embedding": vector}
+            for key, vector in vectors_by_key.items()
+        ])
+        for key, vector in vectors_by_key.items():
+            self._remember(key, vector)
@@ -0,0 +1,70 @@
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger("embedding-worker")
+
+TRUNCATION_POLICIES = ("head", "head_tail")
+
+
+def parse_buckets(spec: str):
+    return sorted(int(bound) for bound in spec.split(",") if bound.strip())
+
+
+def truncate(tokenizer, token_ids, budget: int, policy: str, original: str) -> str:
+    """Apply the truncation policy to a text that exceeds the model's max_seq_length.
+
+    head: keep the first `budget` tokens, which is what the model would do on its own.
+    head_tail: keep the first and last halves, so closing summaries/outcomes survive.
+    """
+    if policy == "head":
+        return original
+    head = budget // 2
+    kept = token_ids[:head] + token_ids[len(token_ids) - (budget - head):]
+    return tokenizer.decode(kept)
+
+
+def encode_bucketed(model, texts, batch_size: int, buckets, truncation: str = "head", normalize: bool = True):
+    """Encode texts grouped by real token length instead of padding everything to the longest.
+
+    Texts are tokenized once up front, truncated to the model's max_seq_length according
+    to `truncation`, and assigned to the smallest bucket bound that fits them; each bucket
+    is encoded separately, so a one-line tech_stack never pays for a multi-paragraph
+    features text in the same padded batch. Returns vectors in the order of `texts`,
+    L2-normalized unless `normalize` is False.
+    """
+    tokenizer = model.tokenizer
+    # Room for the [CLS]/[SEP] special tokens the model adds around every sequence
+    budget = model.max_seq_length - 2
+    token_ids = tokenizer(list(texts), add_special_tokens=False, verbose=False)["input_ids"]
+
+    prepared = []
+    lengths = []
+    truncated = 0
+    for text, ids in zip(texts, token_ids):
+        if len(ids) > budget:
+            truncated += 1
+            text = truncate(tokenizer, ids, budget, truncation, text)
+        prepared.append(text)
+        lengths.append(min(len(ids), budget))
+    if truncated:
+        logger.info(f"Truncated {truncated} texts to {budget} tokens (policy '{truncation}')")
+
+    bounds = [bound for bound in buckets if bound < budget] + [budget]
+    grouped = {}
+    for index in np.argsort(lengths, kind="stable"):
+        bound = next(b for b in bounds if lengths[index] <= b)
+        grouped.setdefault(bound, []).append(index)
+
+    vectors = [None] * len(prepared)
+    for bound, indices in grouped.items():
+        started = time.perf_counter()
+        encoded = model.encode([prepared[i] for i in indices], batch_size=batch_size, normalize_embeddings=normalize)
+        for i, vector in zip(indices, encoded):
+            vectors[i] = vector
+        tokens = sum(lengths[i] for i in indices)
+        logger.info(
+            f"Bucket <= {bound} tokens: {len(indices)} texts, {tokens} tokens "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+    return np.stack(vectors)
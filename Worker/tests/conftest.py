@@ -0,0 +1,5 @@
+import sys
+from os.path import dirname, abspath
+
+# The worker runs from its own directory and imports its modules top-level
+sys.path.append(dirname(dirname(abspath(__file__))))
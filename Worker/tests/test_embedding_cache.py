@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock
+from sqlalchemy import MetaData
+from sqlalchemy.dialects import postgresql
+from embedding_cache import EmbeddingCache, cache_table, text_hash
+
+
+def make_cache(max_entries=10000):
+    return EmbeddingCache(cache_table(MetaData(), 3), "all-MiniLM-L6-v2", max_entries)
+
+
+def db_rows(vectors_by_key):
+    return [MagicMock(text_hash=key, embedding=vector) for key, vector in vectors_by_key.items()]
+
+
+def test_text_hash_ignores_whitespace_differences():
+    assert text_hash("Built  a\nKubernetes operator\n") == text_hash("Built a Kubernetes operator")
+    assert text_hash("Built a Kubernetes operator") != text_hash("Built a Kafka consumer")
+
+
+def test_get_many_serves_remembered_vectors_without_a_query():
+    cache = make_cache()
+    session = MagicMock()
+    cache.put_many(session, {"a": [1.0, 0.0, 0.0]})
+    session.reset_mock()
+
+    assert cache.get_many(session, ["a"]) == {"a": [1.0, 0.0, 0.0]}
+    session.execute.assert_not_called()
+
+
+def test_get_many_queries_each_missing_key_once():
+    cache = make_cache()
+    session = MagicMock()
+    session.execute.return_value = db_rows({"b": [0.0, 1.0, 0.0]})
+
+    found = cache.get_many(session, ["b", "c", "b", "c"])
+
+    assert found == {"b": [0.0, 1.0, 0.0]}
+    session.execute.assert_called_once()
+    compiled = session.execute.call_args.args[0].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+    assert sorted(v for v in compiled.params.values() if v in ("b", "c")) == ["b", "c"]
+    # The row found in the table is remembered in-process
+    session.reset_mock()
+    assert cache.get_many(session, ["b"]) == {"b": [0.0, 1.0, 0.0]}
+    session.execute.assert_not_called()
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = make_cache(max_entries=2)
+    session = MagicMock()
+    cache.put_many(session, {"a": [1.0, 0.0, 0.0], "b": [0.0, 1.0, 0.0]})
+    cache.get_many(session, ["a"])  # "a" is now the most recently used
+    cache.put_many(session, {"c": [0.0, 0.0, 1.0]})
+    session.reset_mock()
+    session.execute.return_value = []
+
+    found = cache.get_many(session, ["a", "b", "c"])
+
+    assert set(found) == {"a", "c"}
+    session.execute.assert_called_once()
+
+
+def test_hit_ratio_counts_texts_that_skipped_the_model():
+    cache = make_cache()
+    session = MagicMock()
+    assert cache.hit_ratio == 0.0
+
+    session.execute.return_value = []
+    cache.get_many(session, ["a", "b", "c", "d"])
+    cache.put_many(session, {"a": [1.0, 0.0, 0.0]})
+
+    assert cache.hit_ratio == 0.75
@@ -0,0 +1,79 @@
+import numpy as np
+from length_buckets import encode_bucketed, parse_buckets, truncate
+
+
+class FakeTokenizer:
+    """One token per word; ids index into the words seen so far."""
+
+    def __init__(self):
+        self.vocab = []
+
+    def _id(self, word):
+        if word not in self.vocab:
+            self.vocab.append(word)
+        return self.vocab.index(word)
+
+    def __call__(self, texts, add_special_tokens=True, verbose=True):
+        return {"input_ids": [[self._id(word) for word in text.split()] for text in texts]}
+
+    def decode(self, ids):
+        return " ".join(self.vocab[i] for i in ids)
+
+
+class FakeModel:
+    """Encodes a text as [word count, its position in the call]; records every encode call."""
+
+    def __init__(self, max_seq_length):
+        self.max_seq_length = max_seq_length
+        self.tokenizer = FakeTokenizer()
+        self.calls = []
+
+    def encode(self, texts, batch_size, normalize_embeddings):
+        self.calls.append(list(texts))
+        return np.array([[len(text.split()), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def words(count, prefix="w"):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_parse_buckets_sorts_and_skips_blanks():
+    assert parse_buckets("128, 32,,64") == [32, 64, 128]
+
+
+def test_encode_bucketed_restores_input_order():
+    model = FakeModel(max_seq_length=66)
+    texts = [words(40), words(3), words(20), words(1)]
+
+    vectors = encode_bucketed(model, texts, batch_size=8, buckets=[4, 32])
+
+    assert vectors[:, 0].tolist() == [40, 3, 20, 1]
+
+
+def test_encode_bucketed_assigns_smallest_fitting_bucket():
+    # 12 - 2 special tokens leaves a budget of 10; bounds at or above it collapse into the budget
+    model = FakeModel(max_seq_length=12)
+    texts = [words(4, "a"), words(5, "b"), words(10, "c"), words(15, "d")]
+
+    encode_bucketed(model, texts, batch_size=8, buckets=[4, 8, 16])
+
+    # The over-budget text joins the budget bucket; under 'head' the model cuts it itself
+    assert [[len(text.split()) for text in call] for call in model.calls] == [[4], [5], [10, 15]]
+
+
+def test_head_tail_keeps_both_ends_within_budget():
+    model = FakeModel(max_seq_length=10)
+    long_text = words(20)
+
+    encode_bucketed(model, [long_text], batch_size=8, buckets=[], truncation="head_tail")
+
+    assert model.calls == [[" ".join(["w0", "w1", "w2", "w3", "w16", "w17", "w18", "w19"])]]
+
+
+def test_head_truncation_leaves_the_text_to_the_model():
+    tokenizer = FakeTokenizer()
+    text = words(20)
+    ids = tokenizer([text])["input_ids"][0]
+
+    assert truncate(tokenizer, ids, 8, "head", text) == text
+    assert len(truncate(tokenizer, ids, 7, "head_tail", text).split()) == 7
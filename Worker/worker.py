@@ -1,11 +1,20 @@
 import os
 import time
+import queue
 import logging
+import argparse
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from datetime import timedelta
+import psycopg
 from sentence_transformers import SentenceTransformer
-from sqlalchemy import create_engine, select, update, MetaData, Table, Column, Integer, Text
+from sqlalchemy import create_engine, select, update, text, func, or_, MetaData, Table, Column, Integer, String, Text, DateTime
 from pgvector.sqlalchemy import Vector
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from embedding_cache import EmbeddingCache, cache_table, text_hash
+from length_buckets import TRUNCATION_POLICIES, encode_bucketed, parse_buckets
 
 load_dotenv()
 
@@ -16,84 +25,444 @@ if "postgresql+asyncpg://" in DATABASE_URL:
 elif DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
 
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# Inference runtime: 'torch', 'onnx' (ONNX Runtime) or 'onnx-int8' (dynamically quantized ONNX)
+BACKENDS = ("torch", "onnx", "onnx-int8")
+BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+if BACKEND not in BACKENDS:
+    raise ValueError(f"EMBEDDING_BACKEND must be one of {BACKENDS}, got '{BACKEND}'")
+# Quantized export shipped in the model repo; pick the variant matching the CPU (avx2, avx512, arm64)
+ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+EMBEDDING_DIM = 384
+# Number of rows encoded with a single model.encode() call and written back with one UPDATE
+BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Longest input in tokens; longer texts are cut according to TRUNCATION ('head' or 'head_tail')
+DEFAULT_MAX_SEQ_LENGTH = 256
+MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", str(DEFAULT_MAX_SEQ_LENGTH)))
+TRUNCATION = os.getenv("EMBEDDING_TRUNCATION", "head")
+if TRUNCATION not in TRUNCATION_POLICIES:
+    raise ValueError(f"EMBEDDING_TRUNCATION must be one of {TRUNCATION_POLICIES}, got '{TRUNCATION}'")
+# Token-length bucket bounds; each bucket is padded only to its own longest text
+LENGTH_BUCKETS = parse_buckets(os.getenv("EMBEDDING_LENGTH_BUCKETS", "32,64,128"))
+# Identifies how cached vectors were produced; a different runtime, length limit or truncation yields different vectors
+MODEL_ID = MODEL_NAME
+if BACKEND != "torch":
+    MODEL_ID += f"/{BACKEND}"
+if MAX_SEQ_LENGTH != DEFAULT_MAX_SEQ_LENGTH:
+    MODEL_ID += f"@{MAX_SEQ_LENGTH}"
+if TRUNCATION != "head":
+    MODEL_ID += f"+{TRUNCATION}"
+# Channel the API NOTIFYs on whenever it writes text that needs an embedding
+JOBS_CHANNEL = "embedding_jobs"
+# Full sweep for anything a missed NOTIFY left behind (e.g. rows written while the worker was down)
+SWEEP_INTERVAL = float(os.getenv("EMBEDDING_SWEEP_INTERVAL", "300"))
+# After the first NOTIFY, keep collecting for this long so a burst of writes becomes one batch
+NOTIFY_DEBOUNCE = float(os.getenv("EMBEDDING_NOTIFY_DEBOUNCE", "0.05"))
+# How long a claimed batch belongs to one worker; rows of a worker that died are reclaimed afterwards
+LEASE_DURATION = timedelta(seconds=float(os.getenv("EMBEDDING_LEASE_SECONDS", "300")))
+# Entries kept in the in-process LRU in front of the embedding_cache table
+CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+# Encoder processes per worker, each with its own model; 0 encodes inline in the worker process
+ENCODER_PROCESSES = int(os.getenv("EMBEDDING_ENCODER_PROCESSES", "0"))
+# Claimed batches allowed to wait between pipeline stages before the claiming side blocks
+QUEUE_DEPTH = int(os.getenv("EMBEDDING_QUEUE_DEPTH", "4"))
+# While blocked on a full queue, how often the claiming side checks for dead encoder processes
+SUBMIT_POLL = float(os.getenv("EMBEDDING_SUBMIT_POLL_SECONDS", "5"))
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger("embedding-worker")
 
-def run_worker():
-    logger.info("Initializing worker... loading model 'all-MiniLM-L6-v2'")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("Model loaded successfully.")
+metadata = MetaData()
 
-    engine = create_engine(DATABASE_URL)
-    Session = sessionmaker(bind=engine)
-    
-    metadata = MetaData()
-    project_embeddings = Table(
-        'project_embeddings', metadata,
-        Column('id', Integer, primary_key=True),
-        Column('raw_text', Text),
-        Column('embedding', Vector(384))
+project_embeddings = Table(
+    'project_embeddings', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('raw_text', Text),
+    Column('embedding', Vector(EMBEDDING_DIM)),
+    Column('embedding_lease_until', DateTime(timezone=True)),
+    Column('text_hash', String(32)),
+    Column('embedding_text_hash', String(32))
+)
+
+experiences = Table(
+    'experiences', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('short_description', Text),
+    Column('description_embedding', Vector(EMBEDDING_DIM)),
+    Column('embedding_lease_until', DateTime(timezone=True)),
+    Column('text_hash', String(32)),
+    Column('embedding_text_hash', String(32))
+)
+
+titles = Table(
+    'titles', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('description', Text),
+    Column('description_embedding', Vector(EMBEDDING_DIM)),
+    Column('embedding_lease_until', DateTime(timezone=True)),
+    Column('text_hash', String(32)),
+    Column('embedding_text_hash', String(32))
+)
+
+embedding_cache = cache_table(metadata, EMBEDDING_DIM)
+
+# Per-connection staging table for bulk write-back; rows are dropped on every commit
+embedding_updates = Table(
+    'embedding_updates', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('embedding', Vector(EMBEDDING_DIM)),
+    Column('text_hash', String(32))
+)
+
+CREATE_STAGING_TABLE = text(
+    f"CREATE TEMPORARY TABLE IF NOT EXISTS embedding_updates "
+    f"(id integer PRIMARY KEY, embedding vector({EMBEDDING_DIM}), text_hash varchar(32)) ON COMMIT DELETE ROWS"
+)
+
+
+@dataclass(frozen=True)
+class EmbeddingTarget:
+    """A table whose text column needs a vector computed by the worker."""
+    name: str
+    table: Table
+    text_column: str
+    embedding_column: str
+
+
+TARGETS = [
+    EmbeddingTarget("project", project_embeddings, "raw_text", "embedding"),
+    EmbeddingTarget("experience", experiences, "short_description", "description_embedding"),
+    EmbeddingTarget("title", titles, "description", "description_embedding"),
+]
+TARGETS_BY_NAME = {target.name: target for target in TARGETS}
+
+
+def claim_batch(session, target: EmbeddingTarget, limit: int, after_id: int = 0):
+    """Lease up to `limit` pending rows with id > after_id and return (id, text, text_hash) for each.
+
+    A row is pending when it has no vector yet or its text changed since the vector was
+    computed (the worker records the text_hash it embedded; text_hash is generated from
+    the current text). FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint
+    batches without blocking each other; rows whose lease has expired are pending again.
+    Callers walk the backlog as a keyset cursor on id, so every claim is a bounded range
+    scan of the stale-rows index that starts where the previous batch ended and only one
+    batch of text is ever held in memory.
+    """
+    table = target.table
+    pending = (
+        select(table.c.id)
+        .where(table.c.embedding_text_hash.is_distinct_from(table.c.text_hash))
+        .where(or_(table.c.embedding_lease_until == None, table.c.embedding_lease_until < func.now()))
+        .where(table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(table)
+        .where(table.c.id.in_(pending))
+        .values(embedding_lease_until=func.now() + LEASE_DURATION)
+        .returning(table.c.id, table.c[target.text_column], table.c.text_hash)
+    )
+    rows = session.execute(stmt).all()
+    session.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def write_embeddings(session, target: EmbeddingTarget, rows, vectors):
+    """Write a whole batch back with one set-based UPDATE ... FROM the staging table.
+
+    Each row records the text_hash it was claimed with, so text edited while the batch
+    was being encoded still counts as stale and is picked up again.
+    """
+    session.execute(CREATE_STAGING_TABLE)
+    session.execute(
+        embedding_updates.insert(),
+        [
+            {"id": row_id, "embedding": vector, "text_hash": row_hash}
+            for (row_id, _, row_hash), vector in zip(rows, vectors)
+        ]
+    )
+    table = target.table
+    session.execute(
+        update(table)
+        .where(table.c.id == embedding_updates.c.id)
+        .values({
+            target.embedding_column: embedding_updates.c.embedding,
+            "embedding_text_hash": embedding_updates.c.text_hash,
+            "embedding_lease_until": None,
+        })
     )
-    
-    experiences = Table(
-        'experiences', metadata,
-        Column('id', Integer, primary_key=True),
-        Column('short_description', Text),
-        Column('description_embedding', Vector(384))
+    session.commit()
+
+
+@dataclass
+class EmbeddingJob:
+    """One claimed batch on its way from the claiming side through the model to the writer."""
+    target_name: str
+    rows: list
+    keys: list
+    vectors_by_key: dict
+    to_encode: dict
+    started: float
+    fresh: dict = field(default_factory=dict)
+
+
+def prepare_job(session, cache: EmbeddingCache, target: EmbeddingTarget, batch) -> EmbeddingJob:
+    """Resolve cached vectors up front so only never-seen texts go through the model."""
+    rows = [(row.id, row[1], row.text_hash) for row in batch]
+    keys = [text_hash(row_text) for _, row_text, _ in rows]
+    vectors_by_key = cache.get_many(session, keys)
+
+    to_encode = {}
+    for key, (_, row_text, _) in zip(keys, rows):
+        if key not in vectors_by_key:
+            to_encode.setdefault(key, row_text)
+    return EmbeddingJob(target.name, rows, keys, vectors_by_key, to_encode, time.perf_counter())
+
+
+def load_model(backend: str = BACKEND):
+    if backend == "onnx":
+        model = SentenceTransformer(MODEL_NAME, backend="onnx")
+    elif backend == "onnx-int8":
+        model = SentenceTransformer(MODEL_NAME, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE})
+    else:
+        model = SentenceTransformer(MODEL_NAME)
+    model.max_seq_length = MAX_SEQ_LENGTH
+    return model
+
+
+def encode_job(model, job: EmbeddingJob) -> EmbeddingJob:
+    if job.to_encode:
+        encoded = encode_bucketed(model, list(job.to_encode.values()), BATCH_SIZE, LENGTH_BUCKETS, TRUNCATION)
+        job.fresh = dict(zip(job.to_encode.keys(), encoded))
+    return job
+
+
+def finish_job(session, cache: EmbeddingCache, job: EmbeddingJob):
+    target = TARGETS_BY_NAME[job.target_name]
+    cache.put_many(session, job.fresh)
+    job.vectors_by_key.update(job.fresh)
+    write_embeddings(session, target, job.rows, [job.vectors_by_key[key] for key in job.keys])
+
+    elapsed = time.perf_counter() - job.started
+    ids = [row_id for row_id, _, _ in job.rows]
+    logger.info(
+        f"Embedded {len(ids)} {target.name} records (IDs {ids[0]}-{ids[-1]}) "
+        f"in {elapsed:.2f}s ({len(ids) / elapsed:.1f} rows/sec, cache hit ratio {cache.hit_ratio:.1%})"
     )
 
-    logger.info("Worker started. Polling for records without embeddings...")
 
+def process_target(session, model, cache: EmbeddingCache, target: EmbeddingTarget) -> int:
+    processed = 0
+    after_id = 0
     while True:
+        batch = claim_batch(session, target, BATCH_SIZE, after_id)
+        if not batch:
+            if processed:
+                logger.info(f"Finished pass over {target.name} backlog: {processed} records")
+            return processed
+
+        job = prepare_job(session, cache, target, batch)
+        finish_job(session, cache, encode_job(model, job))
+        processed += len(batch)
+        after_id = batch[-1].id
+
+
+def encoder_loop(jobs, results, num_threads: int):
+    """Encoder process: owns one model and turns claimed jobs into vectors."""
+    import torch
+    torch.set_num_threads(num_threads)
+    model = load_model()
+    logger.info(f"Encoder process {os.getpid()} ready ({num_threads} threads)")
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
         try:
+            encoded = encode_job(model, job)
+        except Exception as e:
+            # Nothing is written for the batch; the rows stay leased and are reclaimed once the lease expires
+            logger.error(f"Dropped {job.target_name} batch of {len(job.rows)} rows in encoder {os.getpid()}: {e}")
+            continue
+        results.put(encoded)
+
+
+class EmbeddingPipeline:
+    """Claim -> encode -> write with the stages running concurrently.
+
+    The claiming side (the worker's main loop) and a single writer thread share this
+    process and do all database I/O, while `encoders` processes keep the cores busy
+    with the model. Bounded queues apply backpressure: once QUEUE_DEPTH batches are
+    waiting, claiming blocks instead of leasing rows nobody will get to in time.
+    """
+
+    def __init__(self, Session, cache: EmbeddingCache, encoders: int, depth: int = QUEUE_DEPTH):
+        self.ctx = multiprocessing.get_context("spawn")
+        self.Session = Session
+        self.cache = cache
+        self.jobs = self.ctx.Queue(maxsize=depth)
+        self.results = self.ctx.Queue(maxsize=depth)
+        self.threads_per_encoder = max(1, (os.cpu_count() or 1) // encoders)
+        self.encoders = [self._start_encoder() for _ in range(encoders)]
+        self.writer = threading.Thread(target=self._write_loop, name="embedding-writer", daemon=True)
+        self.writer.start()
+
+    def _start_encoder(self):
+        process = self.ctx.Process(
+            target=encoder_loop, args=(self.jobs, self.results, self.threads_per_encoder), daemon=True
+        )
+        process.start()
+        return process
+
+    def ensure_running(self):
+        for i, process in enumerate(self.encoders):
+            if not process.is_alive():
+                # Whatever batch it was encoding is lost; those rows wait for their lease to expire
+                logger.error(f"Encoder process {process.pid} exited with code {process.exitcode}, dropping its "
+                             f"in-flight batch until the lease expires ({LEASE_DURATION}); restarting")
+                self.encoders[i] = self._start_encoder()
+
+    def submit(self, job: EmbeddingJob):
+        # Fully cached batches skip the model entirely
+        if not job.to_encode:
+            self.results.put(job)
+            return
+        while True:
+            try:
+                self.jobs.put(job, timeout=SUBMIT_POLL)
+                return
+            except queue.Full:
+                # The queue only drains while encoders are alive; one may have died mid-pass
+                self.ensure_running()
+
+    def _write_loop(self):
+        with self.Session() as session:
+            while True:
+                job = self.results.get()
+                try:
+                    finish_job(session, self.cache, job)
+                except Exception as e:
+                    # The rows stay leased and are reclaimed once the lease expires
+                    logger.error(f"Error writing {job.target_name} batch: {e}")
+                    session.rollback()
+
+    def process_target(self, session, target: EmbeddingTarget) -> int:
+        self.ensure_running()
+        claimed = 0
+        after_id = 0
+        while True:
+            batch = claim_batch(session, target, BATCH_SIZE, after_id)
+            if not batch:
+                return claimed
+            self.submit(prepare_job(session, self.cache, target, batch))
+            claimed += len(batch)
+            after_id = batch[-1].id
+
+
+def listen(engine):
+    """Open a dedicated autocommit connection subscribed to the jobs channel."""
+    conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = psycopg.connect(conninfo, autocommit=True)
+    conn.execute(f"LISTEN {JOBS_CHANNEL}")
+    return conn
+
+
+def wait_for_jobs(listen_conn, last_sweep: float):
+    """Block until the API announces new text or the next sweep is due.
+
+    Returns the targets to process: the ones named in the received notifications, or
+    every target when SWEEP_INTERVAL has passed since `last_sweep` (a time.monotonic()
+    value), even if notifications keep arriving, or when a payload is unknown.
+    """
+    remaining = SWEEP_INTERVAL - (time.monotonic() - last_sweep)
+    if remaining <= 0:
+        return TARGETS
+
+    names = set()
+    for notify in listen_conn.notifies(timeout=remaining, stop_after=1):
+        names.add(notify.payload)
+    if not names:
+        return TARGETS
+
+    for notify in listen_conn.notifies(timeout=NOTIFY_DEBOUNCE):
+        names.add(notify.payload)
+    if time.monotonic() - last_sweep >= SWEEP_INTERVAL or not names <= TARGETS_BY_NAME.keys():
+        return TARGETS
+    return [TARGETS_BY_NAME[name] for name in names]
+
+
+def run_worker(encoders: int = ENCODER_PROCESSES):
+    cache = EmbeddingCache(embedding_cache, MODEL_ID, CACHE_SIZE)
+    engine = create_engine(DATABASE_URL)
+    Session = sessionmaker(bind=engine)
+
+    if encoders > 0:
+        logger.info(f"Initializing worker... starting {encoders} encoder processes for '{MODEL_NAME}'")
+        pipeline = EmbeddingPipeline(Session, cache, encoders)
+        process = pipeline.process_target
+    else:
+        logger.info(f"Initializing worker... loading model '{MODEL_NAME}' ({BACKEND} backend)")
+        model = load_model()
+        logger.info("Model loaded successfully.")
+
+        def process(session, target):
+            return process_target(session, model, cache, target)
+
+    logger.info(f"Worker started (batch size {BATCH_SIZE}). Listening on '{JOBS_CHANNEL}'...")
+
+    listen_conn = None
+    last_sweep = time.monotonic()
+    while True:
+        try:
+            if listen_conn is None or listen_conn.closed:
+                # Subscribe before sweeping so nothing written during the sweep is missed
+                listen_conn = listen(engine)
+                targets = TARGETS
+            else:
+                targets = wait_for_jobs(listen_conn, last_sweep)
+            if targets is TARGETS:
+                last_sweep = time.monotonic()
+
             with Session() as session:
-                # Process project embeddings
-                stmt = select(project_embeddings).where(project_embeddings.c.embedding == None)
-                result = session.execute(stmt).all()
-                
-                if result:
-                    logger.info(f"Found {len(result)} project records to process.")
-                    for row in result:
-                        logger.info(f"Processing project record ID: {row.id} (Text length: {len(row.raw_text)})")
-                        
-                        # Generate embedding
-                        embedding_vector = model.encode(row.raw_text).tolist()
-                        
-                        # Update DB
-                        update_stmt = update(project_embeddings).where(project_embeddings.c.id == row.id).values(embedding=embedding_vector)
-                        session.execute(update_stmt)
-                        session.commit()
-                        logger.info(f"Successfully updated project embedding for record ID: {row.id}")
-                
-                # Process experience embeddings
-                exp_stmt = select(experiences).where(experiences.c.description_embedding == None)
-                exp_result = session.execute(exp_stmt).all()
-                
-                if exp_result:
-                    logger.info(f"Found {len(exp_result)} experience records to process.")
-                    for row in exp_result:
-                        logger.info(f"Processing experience record ID: {row.id} (Text length: {len(row.short_description)})")
-                        
-                        # Generate embedding
-                        embedding_vector = model.encode(row.short_description).tolist()
-                        
-                        # Update DB
-                        update_stmt = update(experiences).where(experiences.c.id == row.id).values(description_embedding=embedding_vector)
-                        session.execute(update_stmt)
-                        session.commit()
-                        logger.info(f"Successfully updated experience embedding for record ID: {row.id}")
-                
-                if not result and not exp_result:
-                    # Silent poll
-                    pass
-            
-            time.sleep(10)
+                for target in targets:
+                    process(session, target)
         except Exception as e:
             logger.error(f"Error in worker loop: {e}")
+            if listen_conn is not None:
+                listen_conn.close()
+                listen_conn = None
             time.sleep(30)
 
+def main():
+    parser = argparse.ArgumentParser(description="Compute embeddings for project descriptions, experiences and titles.")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("EMBEDDING_WORKERS", "1")),
+        help="number of worker processes to run on this host, each claiming batches independently"
+    )
+    parser.add_argument(
+        "--encoders", type=int, default=ENCODER_PROCESSES,
+        help="encoder processes per worker, each with its own model (0 encodes inline)"
+    )
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker(args.encoders)
+        return
+
+    logger.info(f"Starting {args.workers} worker processes")
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(args.encoders,), name=f"embedding-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
 if __name__ == "__main__":
-    run_worker()
+    main()